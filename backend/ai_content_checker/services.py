@@ -1,3 +1,4 @@
+import json
 import openai
 from django.conf import settings
 from django.core.exceptions import ValidationError
@@ -56,6 +57,70 @@ class AIContentChecker:
                 'success': False
             }
     
+    def check_article_sections(self, title, sections, excerpt=""):
+        """
+        Vérifie plusieurs sections d'un article en une seule requête
+        
+        Returns:
+            list: un résultat par section, dans l'ordre ({'score', 'feedback'}),
+                  ou None si la réponse ne permet pas de conclure
+        """
+        if not sections:
+            return []
+        try:
+            numbered = "\n".join(
+                f"[{index}] {json.dumps(section[:2000], ensure_ascii=False)}"
+                for index, section in enumerate(sections, start=1)
+            )
+            prompt = f"""
+            Analyse la qualité de chacune des sections numérotées ci-dessous, extraites
+            de l'article « {title} » (extrait : {excerpt}).
+            
+            {numbered}
+            
+            Pour chaque section, évalue la structure, la lisibilité, la valeur
+            informative, la grammaire et l'orthographe, et donne un score sur 10 avec
+            deux ou trois recommandations courtes et concrètes.
+            
+            Réponds uniquement par un tableau JSON, un objet par section :
+            [{{"id": 1, "score": 7.5, "feedback": "..."}}, ...]
+            """
+            
+            response = openai.ChatCompletion.create(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": "Tu es un expert en rédaction web et SEO qui analyse la qualité du contenu."},
+                    {"role": "user", "content": prompt}
+                ],
+                max_tokens=min(4000, 100 + 150 * len(sections)),
+                temperature=0.3
+            )
+            
+            return self._parse_section_checks(response.choices[0].message.content, len(sections))
+            
+        except Exception as e:
+            logger.error(f"Erreur lors de la vérification IA des sections: {str(e)}")
+            return [None] * len(sections)
+    
+    def _parse_section_checks(self, result, count):
+        """Associe les résultats JSON de l'IA aux sections, par numéro"""
+        checks = [None] * count
+        try:
+            items = json.loads(result[result.index('['):result.rindex(']') + 1])
+        except ValueError:
+            logger.error("Réponse de vérification des sections illisible")
+            return checks
+        
+        for item in items:
+            try:
+                index = int(item['id']) - 1
+                score = min(10.0, max(0.0, float(item['score'])))
+                if 0 <= index < count:
+                    checks[index] = {'score': score, 'feedback': str(item.get('feedback') or '')}
+            except (KeyError, TypeError, ValueError):
+                continue
+        return checks
+    
     def _create_content_check_prompt(self, title, content, excerpt):
         """Crée le prompt pour l'analyse du contenu"""
         return f"""
@@ -138,6 +203,72 @@ class AIContentChecker:
                 'reason': None
             }
     
+    def moderate_comments(self, comments):
+        """
+        Modère plusieurs commentaires en une seule requête
+        
+        Returns:
+            list: un verdict par commentaire, dans l'ordre
+                  ({'appropriate', 'confidence', 'reason'}), ou None si
+                  la réponse ne permet pas de conclure
+        """
+        if not comments:
+            return []
+        try:
+            numbered = "\n".join(
+                f"[{index}] {json.dumps(comment[:1000], ensure_ascii=False)}"
+                for index, comment in enumerate(comments, start=1)
+            )
+            prompt = f"""
+            Analyse chacun des commentaires numérotés ci-dessous et détermine s'il contient
+            du contenu inapproprié, offensant, du spam ou non conforme aux standards éthiques.
+            
+            {numbered}
+            
+            Réponds uniquement par un tableau JSON, un objet par commentaire :
+            [{{"id": 1, "appropriate": true, "confidence": 0.95, "reason": ""}}, ...]
+            confidence est ta certitude entre 0 et 1, reason explique un refus.
+            """
+            
+            response = openai.ChatCompletion.create(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": "Tu es un modérateur de contenu qui vérifie la conformité éthique."},
+                    {"role": "user", "content": prompt}
+                ],
+                max_tokens=100 + 60 * len(comments),
+                temperature=0.1
+            )
+            
+            return self._parse_moderation(response.choices[0].message.content, len(comments))
+            
+        except Exception as e:
+            logger.error(f"Erreur lors de la modération des commentaires: {str(e)}")
+            return [None] * len(comments)
+    
+    def _parse_moderation(self, result, count):
+        """Associe les verdicts JSON de l'IA aux commentaires, par numéro"""
+        verdicts = [None] * count
+        try:
+            items = json.loads(result[result.index('['):result.rindex(']') + 1])
+        except ValueError:
+            logger.error("Réponse de modération illisible")
+            return verdicts
+        
+        for item in items:
+            try:
+                index = int(item['id']) - 1
+                confidence = min(1.0, max(0.0, float(item['confidence'])))
+                if 0 <= index < count and isinstance(item['appropriate'], bool):
+                    verdicts[index] = {
+                        'appropriate': item['appropriate'],
+                        'confidence': confidence,
+                        'reason': str(item.get('reason') or ''),
+                    }
+            except (KeyError, TypeError, ValueError):
+                continue
+        return verdicts
+    
     def suggest_improvements(self, content, aspect="general"):
         """
         Suggère des améliorations pour un aspect spécifique du contenu
@@ -1,14 +1,16 @@
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 from .services import AIContentChecker
+from blog.throttling import AIRateThrottle, AIIPRateThrottle
 from django.views.decorators.csrf import csrf_exempt
 import json
 
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
+@throttle_classes([AIRateThrottle, AIIPRateThrottle])
 def check_article_content(request):
     """
     Vérifie le contenu d'un article avec l'IA
@@ -50,6 +52,7 @@ def check_article_content(request):
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
+@throttle_classes([AIRateThrottle, AIIPRateThrottle])
 def check_content_appropriate(request):
     """
     Vérifie si le contenu est approprié
@@ -83,6 +86,7 @@ def check_content_appropriate(request):
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
+@throttle_classes([AIRateThrottle, AIIPRateThrottle])
 def suggest_improvements(request):
     """
     Suggère des améliorations pour le contenu
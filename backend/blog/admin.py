@@ -1,29 +1,82 @@
+from django.conf import settings
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
 from .models import Article, Category, Tag, Comment
 
 
+def estimated_row_count(model, using='default'):
+    """Nombre de lignes estimé par les statistiques du SGBD (None si indisponible)"""
+    connection = connections[using]
+    queries = {
+        'mysql': (
+            'SELECT TABLE_ROWS FROM information_schema.TABLES '
+            'WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s'
+        ),
+        'postgresql': 'SELECT reltuples::bigint FROM pg_class WHERE relname = %s',
+    }
+    if connection.vendor not in queries:
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(queries[connection.vendor], [model._meta.db_table])
+        row = cursor.fetchone()
+    return row[0] if row and row[0] is not None and row[0] >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Pagination de l'admin sans COUNT(*) complet sur les grandes tables.
+    
+    Une liste sans filtre ni recherche utilise l'estimation du SGBD dès
+    qu'elle dépasse ADMIN_ESTIMATED_COUNT_THRESHOLD lignes ; les listes
+    filtrées gardent un comptage exact.
+    """
+    
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimated_row_count(queryset.model, queryset.db)
+            if estimate is not None and estimate > settings.ADMIN_ESTIMATED_COUNT_THRESHOLD:
+                return estimate
+        return super().count
+
+
+class PerformanceAdmin(admin.ModelAdmin):
+    """Réglages communs pour les listes volumineuses"""
+    paginator = EstimatedCountPaginator
+    # Évite un second COUNT(*) sur toute la table quand une recherche est active
+    show_full_result_count = False
+
+
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
-    list_display = ['name', 'slug', 'created_at']
+    list_display = ['name', 'slug', 'article_count', 'created_at']
     list_filter = ['created_at']
-    search_fields = ['name']
+    # Préfixe : utilise l'index unique sur name
+    search_fields = ['^name']
     prepopulated_fields = {'slug': ('name',)}
 
 
 @admin.register(Tag)
 class TagAdmin(admin.ModelAdmin):
-    list_display = ['name', 'slug']
-    search_fields = ['name']
+    list_display = ['name', 'slug', 'article_count']
+    search_fields = ['^name']
     prepopulated_fields = {'slug': ('name',)}
 
 
 @admin.register(Article)
-class ArticleAdmin(admin.ModelAdmin):
+class ArticleAdmin(PerformanceAdmin):
     list_display = ['title', 'author', 'category', 'status', 'created_at', 'published_at', 'ai_checked', 'ai_score']
     list_filter = ['status', 'created_at', 'published_at', 'category', 'ai_checked']
-    search_fields = ['title', 'content', 'excerpt']
+    list_select_related = ['author', 'category']
+    # Recherches servies par des index : préfixe du titre, slug exact
+    search_fields = ['^title', '=slug']
+    autocomplete_fields = ['author', 'category', 'tags']
     prepopulated_fields = {'slug': ('title',)}
-    date_hierarchy = 'created_at'
+    # Pas de date_hierarchy : sa requête DISTINCT sur les dates parcourt toute la
+    # table ; le filtre 'created_at' propose des plages fixes sans requête
     ordering = ['-created_at']
     
     fieldsets = (
@@ -44,19 +97,29 @@ class ArticleAdmin(admin.ModelAdmin):
     )
     
     readonly_fields = ['created_at', 'updated_at', 'published_at']
+    
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        if request.resolver_match and request.resolver_match.url_name == 'blog_article_changelist':
+            # La liste n'affiche pas le texte : inutile de charger les contenus
+            queryset = queryset.defer('content', 'content_html', 'content_toc', 'ai_feedback')
+        return queryset
 
 
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
-    list_display = ['author_name', 'article', 'created_at', 'is_approved']
-    list_filter = ['is_approved', 'created_at']
-    search_fields = ['author_name', 'content']
+class CommentAdmin(PerformanceAdmin):
+    list_display = ['author_name', 'article', 'created_at', 'is_approved', 'moderation_status', 'moderation_confidence']
+    list_filter = ['is_approved', 'moderation_status', 'created_at']
+    list_select_related = ['article']
+    search_fields = ['^author_name', '=author_email']
+    autocomplete_fields = ['article']
     actions = ['approve_comments', 'disapprove_comments']
     
     def approve_comments(self, request, queryset):
-        queryset.update(is_approved=True)
+        queryset.update(is_approved=True, moderation_status='approved', moderation_claimed_at=None)
     approve_comments.short_description = "Approuver les commentaires sélectionnés"
     
     def disapprove_comments(self, request, queryset):
-        queryset.update(is_approved=False)
+        # Décision manuelle : le worker de modération ne repasse pas dessus
+        queryset.update(is_approved=False, moderation_status='flagged', moderation_claimed_at=None)
     disapprove_comments.short_description = "Désapprouver les commentaires sélectionnés"
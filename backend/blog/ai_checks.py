@@ -0,0 +1,115 @@
+"""
+Vérification IA des articles section par section.
+
+Le contenu est découpé aux titres Markdown ; le résultat de chaque section
+est conservé dans SectionCheck sous l'empreinte de son texte. Quand un
+article modifié est revérifié, seules les sections nouvelles ou changées
+sont envoyées à l'IA, les autres reprennent leur résultat précédent.
+
+Les sections à vérifier sont envoyées ensemble, en une requête par tranche
+d'au plus SECTION_BATCH_SIZE sections et SECTION_BATCH_CHARS caractères
+(une seule pour un article courant). Les résultats de chaque requête sont enregistrés dès leur
+réception : une erreur sur une tranche suivante ne fait pas perdre ceux qui
+ont déjà été payés.
+"""
+import hashlib
+import re
+
+from django.conf import settings
+
+from .models import SectionCheck
+
+HEADING_RE = re.compile(r'^#{1,6}\s', re.MULTILINE)
+
+# Limites d'une requête, pour rester dans le contexte du modèle
+# (chaque section est tronquée à 2000 caractères)
+SECTION_BATCH_SIZE = 20
+SECTION_BATCH_CHARS = 12000
+
+
+def split_sections(content):
+    """Découpe le Markdown en sections commençant chacune par un titre"""
+    starts = [match.start() for match in HEADING_RE.finditer(content)]
+    if not starts or starts[0] != 0:
+        starts.insert(0, 0)
+    bounds = zip(starts, starts[1:] + [len(content)])
+    return [content[start:end] for start, end in bounds if content[start:end].strip()]
+
+
+def section_hash(text):
+    # Le modèle fait partie de la clé : en changer invalide les résultats
+    key = f'{settings.OPENAI_MODEL}\0{text.strip()}'
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+def _batches(items):
+    """Regroupe les sections (empreinte, texte) en tranches d'une requête"""
+    batch, size = [], 0
+    for h, section in items:
+        length = min(len(section), 2000)
+        if batch and (len(batch) == SECTION_BATCH_SIZE or size + length > SECTION_BATCH_CHARS):
+            yield batch
+            batch, size = [], 0
+        batch.append((h, section))
+        size += length
+    if batch:
+        yield batch
+
+
+def check_article(article, checker=None):
+    """
+    Vérifie l'article en ne soumettant à l'IA que les sections inconnues.
+
+    Retourne un dict au format de AIContentChecker.check_article_content,
+    plus 'sections' et 'reused_sections'. Le score est la moyenne des scores
+    des sections pondérée par leur longueur.
+    """
+    if checker is None:
+        from ai_content_checker.services import AIContentChecker
+        checker = AIContentChecker()
+
+    sections = split_sections(article.content) or [article.content]
+    hashes = [section_hash(section) for section in sections]
+    checks = {check.section_hash: check for check in SectionCheck.objects.filter(section_hash__in=hashes)}
+    reused = sum(1 for h in hashes if h in checks)
+
+    unknown = {}
+    for section, h in zip(sections, hashes):
+        if h not in checks:
+            unknown.setdefault(h, section)
+
+    for batch in _batches(list(unknown.items())):
+        results = checker.check_article_sections(
+            article.title, [section for _, section in batch], article.excerpt
+        )
+        new_checks = [
+            SectionCheck(section_hash=h, score=result['score'], feedback=result['feedback'])
+            for (h, _), result in zip(batch, results) if result is not None
+        ]
+        SectionCheck.objects.bulk_create(new_checks, ignore_conflicts=True)
+        checks.update((check.section_hash, check) for check in new_checks)
+        if len(new_checks) < len(batch):
+            missing = len(batch) - len(new_checks)
+            return {
+                'score': None,
+                'feedback': f"Erreur lors de la vérification: {missing} section(s) non vérifiée(s)",
+                'checked': False,
+                'success': False,
+            }
+
+    scored = [(checks[h].score, len(section)) for section, h in zip(sections, hashes)
+              if checks[h].score is not None]
+    total_length = sum(length for _, length in scored)
+    score = round(sum(s * length for s, length in scored) / total_length, 1) if total_length else None
+    feedback = '\n\n'.join(
+        f"### {section.strip().splitlines()[0].lstrip('#').strip()}\n{checks[h].feedback}"
+        for section, h in zip(sections, hashes)
+    )
+    return {
+        'score': score,
+        'feedback': feedback,
+        'checked': True,
+        'success': True,
+        'sections': len(sections),
+        'reused_sections': reused,
+    }
@@ -1,14 +1,17 @@
-from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 from django.contrib.auth.models import User
 from django.contrib.auth import authenticate
 from django.db import IntegrityError
 from .serializers import UserSerializer
+from .throttling import RegisterRateThrottle
 
 
 @api_view(['POST'])
+@permission_classes([AllowAny])
+@throttle_classes([RegisterRateThrottle])
 def register(request):
     """Inscription d'un nouvel utilisateur"""
     try:
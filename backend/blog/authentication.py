@@ -0,0 +1,93 @@
+"""Authentification JWT avec cache des utilisateurs en mémoire du processus"""
+import copy
+import threading
+import time
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+
+class UserCache:
+    """
+    Cache des utilisateurs authentifiés, local au processus, à durée de vie courte.
+
+    Les entrées sont invalidées à chaque modification d'un utilisateur dans ce
+    processus (voir blog.signals) ; la durée de vie borne le délai de
+    propagation d'une modification faite par un autre processus.
+    """
+
+    def __init__(self, ttl, max_size):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        expires_at, user = entry
+        if expires_at < time.monotonic():
+            self.invalidate(user_id)
+            return None
+        # Copie pour que les requêtes concurrentes ne partagent pas la même instance
+        return copy.copy(user)
+
+    def set(self, user_id, user):
+        with self._lock:
+            if len(self._entries) >= self.max_size:
+                self._entries.clear()
+            self._entries[user_id] = (time.monotonic() + self.ttl, user)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache(
+    ttl=settings.AUTH_USER_CACHE_TTL,
+    max_size=settings.AUTH_USER_CACHE_MAX_SIZE,
+)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication qui évite la requête sur User tant que l'entrée est en cache"""
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        user = user_cache.get(user_id)
+        if user is None:
+            user = super().get_user(validated_token)
+            user_cache.set(user_id, user)
+        elif api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed(
+                _("The user's password has been changed."), code='password_changed'
+            )
+        return user
+
+
+class TokenObtainPairWithClaimsSerializer(TokenObtainPairSerializer):
+    """Ajoute au token les informations utilisateur dont le frontend a besoin"""
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        token['username'] = user.username
+        token['is_staff'] = user.is_staff
+        return token
@@ -0,0 +1,44 @@
+"""Vérifications de configuration exécutées par manage.py check"""
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Error, Warning, register
+
+
+def cache_is_shared():
+    """Le cache par défaut est-il commun à tous les processus ?"""
+    return not isinstance(caches['default'], (LocMemCache, DummyCache))
+
+
+@register()
+def check_replica_pin_cache(app_configs, **kwargs):
+    """Le maintien sur le primaire après une écriture est stocké dans le cache"""
+    if settings.DATABASE_REPLICA_ALIASES and not cache_is_shared():
+        return [Error(
+            'Les réplicas en lecture demandent un cache partagé entre processus.',
+            hint=(
+                'Renseigner CACHE_URL (Redis) : avec un cache local, la requête '
+                "suivant une écriture peut arriver sur un autre processus et lire "
+                'un réplica en retard.'
+            ),
+            id='blog.E001',
+        )]
+    return []
+
+
+@register(deploy=True)
+def check_syndication_cache(app_configs, **kwargs):
+    """Les commandes (publication programmée, import) invalident les flux dans le cache"""
+    if not cache_is_shared():
+        return [Warning(
+            'Les flux RSS/Atom, les sitemaps et le nuage de tags sont mis en '
+            'cache localement à chaque processus.',
+            hint=(
+                'Renseigner CACHE_URL (Redis) : les invalidations faites par '
+                'publish_scheduled, import_articles ou un autre processus web '
+                "n'atteindraient pas ce cache avant l'expiration de ses entrées."
+            ),
+            id='blog.W001',
+        )]
+    return []
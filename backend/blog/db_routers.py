@@ -0,0 +1,30 @@
+"""
+Routage des lectures vers les réplicas MySQL.
+
+Les lectures ne partent vers un réplica que pendant les requêtes marquées par
+ReplicaRoutingMiddleware ; tout le reste (écritures, commandes de gestion,
+requêtes épinglées sur le primaire) utilise la base 'default'.
+
+Le réplica est choisi une fois par requête par le middleware : toutes les
+lectures d'une même requête voient le même état de la réplication.
+"""
+from contextvars import ContextVar
+
+# Alias du réplica utilisé par les lectures de la requête en cours, ou None
+replica_alias = ContextVar('replica_alias', default=None)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return replica_alias.get() or 'default'
+
+    def db_for_write(self, model, **hints):
+        # Après une écriture, la suite de la requête lit ce qu'elle vient d'écrire
+        replica_alias.set(None)
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
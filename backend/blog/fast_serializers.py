@@ -0,0 +1,125 @@
+"""
+Chemin de lecture rapide pour les listes d'articles.
+
+Construit directement, à partir de lignes .values(), la même sortie que
+ArticleListSerializer, sans instancier de modèles ni de champs DRF par ligne :
+une requête pour les articles (auteur et catégorie en jointure) et une
+requête groupée pour les tags.
+"""
+from collections import defaultdict
+
+from rest_framework import serializers
+
+from .models import Article
+
+AUTHOR_FIELDS = ['id', 'username', 'first_name', 'last_name', 'email']
+CATEGORY_FIELDS = ['id', 'name', 'slug', 'description', 'created_at', 'article_count']
+
+# Champs de ArticleListSerializer, dans le même ordre
+LIST_FIELDS = [
+    'id', 'title', 'slug', 'excerpt', 'status', 'created_at', 'published_at',
+    'author', 'category', 'tags', 'featured_image', 'ai_checked', 'ai_score',
+    'reading_time',
+]
+
+# Colonnes à lire pour chaque champ de sortie
+SOURCE_COLUMNS = {
+    'author': [f'author__{field}' for field in AUTHOR_FIELDS],
+    'category': [f'category__{field}' for field in CATEGORY_FIELDS],
+    'tags': [],
+    'reading_time': ['content'],
+}
+
+_datetime_field = serializers.DateTimeField()
+
+
+def _datetime(value):
+    return None if value is None else _datetime_field.to_representation(value)
+
+
+def _image_url(name, request):
+    """Même rendu que ImageField.to_representation"""
+    if not name:
+        return None
+    url = Article._meta.get_field('featured_image').storage.url(name)
+    if request is not None:
+        return request.build_absolute_uri(url)
+    return url
+
+
+def _reading_time(content):
+    # Même calcul que Article.reading_time
+    words_per_minute = 200
+    return max(1, round(len(content.split()) / words_per_minute))
+
+
+def _tags_by_article(article_ids):
+    tags = defaultdict(list)
+    rows = Article.tags.through.objects.filter(article_id__in=article_ids).order_by(
+        'tag__name'
+    ).values_list('article_id', 'tag_id', 'tag__name', 'tag__slug', 'tag__article_count')
+    for article_id, tag_id, name, slug, article_count in rows:
+        tags[article_id].append({
+            'id': tag_id, 'name': name, 'slug': slug, 'article_count': article_count,
+        })
+    return tags
+
+
+def _category(row):
+    if row['category__id'] is None:
+        return None
+    return {
+        'id': row['category__id'],
+        'name': row['category__name'],
+        'slug': row['category__slug'],
+        'description': row['category__description'],
+        'created_at': _datetime(row['category__created_at']),
+        'article_count': row['category__article_count'],
+    }
+
+
+def serialize_article_list(article_ids, request=None, fields=None):
+    """
+    Sérialise les articles donnés, dans l'ordre des ids, comme ArticleListSerializer.
+
+    request joue le rôle du contexte du sérialiseur : sans lui, les URLs
+    d'images sont relatives. fields restreint la sortie comme SparseFieldsMixin,
+    et les jointures ou requêtes des champs exclus ne sont pas faites.
+    """
+    article_ids = list(article_ids)
+    if not article_ids:
+        return []
+
+    selected = [name for name in LIST_FIELDS if not fields or name in fields] or LIST_FIELDS
+    columns = {'id'}
+    for name in selected:
+        columns.update(SOURCE_COLUMNS.get(name, [name]))
+
+    rows = {
+        row['id']: row
+        for row in Article.objects.filter(pk__in=article_ids).order_by().values(*columns)
+    }
+    tags = _tags_by_article(rows) if 'tags' in selected else {}
+
+    builders = {
+        'created_at': lambda row: _datetime(row['created_at']),
+        'published_at': lambda row: _datetime(row['published_at']),
+        'author': lambda row: {field: row[f'author__{field}'] for field in AUTHOR_FIELDS},
+        'category': _category,
+        'tags': lambda row: tags.get(row['id'], []),
+        'featured_image': lambda row: _image_url(row['featured_image'], request),
+        'reading_time': lambda row: _reading_time(row['content']),
+    }
+    # Les champs sans fonction dédiée sont recopiés tels quels
+    builders = [(name, builders.get(name)) for name in selected]
+
+    data = []
+    for article_id in article_ids:
+        row = rows.get(article_id)
+        if row is None:
+            continue
+        data.append({
+            name: row[name] if build is None else build(row)
+            for name, build in builders
+        })
+    return data
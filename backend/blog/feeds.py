@@ -0,0 +1,132 @@
+"""
+Flux RSS et Atom des articles publiés : global, par catégorie et par tag.
+
+Les réponses sont mises en cache par portée (voir blog.syndication) et ne
+sont régénérées qu'après une publication ou une modification qui les touche.
+"""
+from django.conf import settings
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils.feedgenerator import Atom1Feed
+
+from .models import Article, Category, Tag
+from .syndication import CACHE_TIMEOUT, cache_key
+
+
+class LatestArticlesFeed(Feed):
+    """Derniers articles publiés"""
+    title = 'Blog Minimaliste'
+    description = 'Les derniers articles publiés'
+
+    def link(self):
+        return f'{settings.SITE_URL}/articles'
+
+    def get_articles(self, obj):
+        return Article.objects.published()
+
+    def items(self, obj):
+        return (
+            self.get_articles(obj)
+            .select_related('author')
+            .prefetch_related('tags')
+            .order_by('-published_at')[:settings.FEED_SIZE]
+        )
+
+    def item_title(self, item):
+        return item.title
+
+    def item_description(self, item):
+        return item.excerpt
+
+    def item_pubdate(self, item):
+        return item.published_at
+
+    def item_updateddate(self, item):
+        return item.updated_at
+
+    def item_author_name(self, item):
+        return item.author.get_full_name() or item.author.username
+
+    def item_categories(self, item):
+        return [tag.name for tag in item.tags.all()]
+
+
+class CategoryFeed(LatestArticlesFeed):
+    """Derniers articles publiés d'une catégorie"""
+
+    def get_object(self, request, slug):
+        return get_object_or_404(Category, slug=slug)
+
+    def title(self, obj):
+        return f'Blog Minimaliste - {obj.name}'
+
+    def description(self, obj):
+        return obj.description or f'Les derniers articles de la catégorie {obj.name}'
+
+    def get_articles(self, obj):
+        return Article.objects.published().filter(category=obj)
+
+
+class TagFeed(LatestArticlesFeed):
+    """Derniers articles publiés portant un tag"""
+
+    def get_object(self, request, slug):
+        return get_object_or_404(Tag, slug=slug)
+
+    def title(self, obj):
+        return f'Blog Minimaliste - {obj.name}'
+
+    def description(self, obj):
+        return f'Les derniers articles avec le tag {obj.name}'
+
+    def get_articles(self, obj):
+        return Article.objects.published().filter(tags=obj)
+
+
+class LatestArticlesAtomFeed(LatestArticlesFeed):
+    feed_type = Atom1Feed
+    subtitle = LatestArticlesFeed.description
+
+
+class CategoryAtomFeed(CategoryFeed):
+    feed_type = Atom1Feed
+    subtitle = CategoryFeed.description
+
+
+class TagAtomFeed(TagFeed):
+    feed_type = Atom1Feed
+    subtitle = TagFeed.description
+
+
+def cached_feed(feed_class, scope):
+    """Vue servant le flux depuis le cache de sa portée ('all', 'category' ou 'tag')"""
+    feed = feed_class()
+    format_name = 'atom' if feed_class.feed_type is Atom1Feed else 'rss'
+
+    def view(request, slug=None):
+        kwargs = {} if slug is None else {'slug': slug}
+        feed_scope = f'feed:{scope}' if slug is None else f'feed:{scope}:{slug}'
+        key = cache_key(feed_scope, format_name, request.get_host())
+        cached = cache.get(key)
+        if cached is None:
+            response = feed(request, **kwargs)
+            cached = (response.content, response['Content-Type'], response.get('Last-Modified'))
+            cache.set(key, cached, CACHE_TIMEOUT)
+
+        content, content_type, last_modified = cached
+        response = HttpResponse(content, content_type=content_type)
+        if last_modified:
+            response['Last-Modified'] = last_modified
+        return response
+
+    return view
+
+
+latest_rss = cached_feed(LatestArticlesFeed, 'all')
+latest_atom = cached_feed(LatestArticlesAtomFeed, 'all')
+category_rss = cached_feed(CategoryFeed, 'category')
+category_atom = cached_feed(CategoryAtomFeed, 'category')
+tag_rss = cached_feed(TagFeed, 'tag')
+tag_atom = cached_feed(TagAtomFeed, 'tag')
@@ -0,0 +1,20 @@
+"""Hachage des mots de passe avec des coûts réglables via les settings"""
+from django.conf import settings
+from django.contrib.auth.hashers import Argon2PasswordHasher, ScryptPasswordHasher
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    """
+    Argon2id avec des coûts configurables.
+
+    Le nom d'algorithme est celui d'Argon2PasswordHasher : les hashs existants
+    restent valides et sont recalculés à la connexion si les coûts changent.
+    """
+    time_cost = settings.ARGON2_TIME_COST
+    memory_cost = settings.ARGON2_MEMORY_COST
+    parallelism = settings.ARGON2_PARALLELISM
+
+
+class TunedScryptPasswordHasher(ScryptPasswordHasher):
+    """scrypt avec un facteur de travail configurable"""
+    work_factor = settings.SCRYPT_WORK_FACTOR
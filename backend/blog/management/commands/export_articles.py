@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.portability import export_articles
+
+
+class Command(BaseCommand):
+    help = 'Exporte les articles, commentaires, tags et catégories en JSON par ligne (.gz pour compresser)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Fichier de sortie, ex. articles.jsonl.gz')
+        parser.add_argument('--chunk-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        start = time.monotonic()
+        count = export_articles(options['path'], options['chunk_size'])
+        elapsed = time.monotonic() - start
+        self.stdout.write(self.style.SUCCESS(
+            f'{count} article(s) exporté(s) en {elapsed:.1f} s '
+            f'({count / max(elapsed, 1e-6):.0f} articles/s)'
+        ))
@@ -0,0 +1,35 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.static_export import export_static
+
+
+class Command(BaseCommand):
+    help = 'Exporte les articles publiés et leurs listes en JSON et HTML statiques (incrémental)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help='Dossier de sortie')
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count() or 1,
+            help='Nombre de processus pour générer les articles'
+        )
+        parser.add_argument(
+            '--full', action='store_true',
+            help='Régénère tous les articles, sans tenir compte du dernier export'
+        )
+        parser.add_argument(
+            '--base-url', default='',
+            help='Préfixe des liens entre pages de liste (vide : liens depuis la racine)'
+        )
+
+    def handle(self, *args, **options):
+        start = time.monotonic()
+        exported, removed, pages = export_static(
+            options['output'], options['workers'], options['full'], options['base_url']
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'{exported} article(s) exporté(s), {removed} supprimé(s), '
+            f'{pages} page(s) de liste écrite(s) en {time.monotonic() - start:.1f} s'
+        ))
@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.portability import ImportConflictError, import_articles
+
+
+class Command(BaseCommand):
+    help = 'Importe une sauvegarde produite par export_articles (les slugs existants sont ignorés)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Fichier à importer, ex. articles.jsonl.gz')
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        start = time.monotonic()
+        try:
+            imported, skipped = import_articles(options['path'], options['batch_size'])
+        except ImportConflictError as exc:
+            raise CommandError(exc)
+        elapsed = time.monotonic() - start
+        self.stdout.write(self.style.SUCCESS(
+            f'{imported} article(s) importé(s), {skipped} ignoré(s) en {elapsed:.1f} s '
+            f'({imported / max(elapsed, 1e-6):.0f} articles/s)'
+        ))
@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.moderation import moderate_pending_comments
+
+
+class Command(BaseCommand):
+    help = "Modère les commentaires en attente avec l'IA, par lots"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None)
+        parser.add_argument(
+            '--interval', type=int, default=0,
+            help='Relance la modération toutes les N secondes (0 : un seul passage)'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            count = moderate_pending_comments(options['batch_size'])
+            if count:
+                self.stdout.write(self.style.SUCCESS(f'{count} commentaire(s) modéré(s)'))
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
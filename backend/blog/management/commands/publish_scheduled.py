@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.related import process_related_updates
+from blog.scheduling import publish_due_articles
+
+
+class Command(BaseCommand):
+    help = (
+        'Publie les articles programmés dont la date de publication est atteinte '
+        'et recalcule les articles similaires demandés'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument(
+            '--interval', type=int, default=0,
+            help='Relance le scan toutes les N secondes (0 : un seul passage)'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            count = publish_due_articles(options['batch_size'])
+            if count:
+                self.stdout.write(self.style.SUCCESS(f'{count} article(s) publié(s)'))
+            count = process_related_updates(options['batch_size'])
+            if count:
+                self.stdout.write(self.style.SUCCESS(f'{count} article(s) similaire(s) recalculé(s)'))
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from blog.related import rebuild_related_index
+
+
+class Command(BaseCommand):
+    help = "Recalcule entièrement l'index des articles similaires"
+
+    def handle(self, *args, **options):
+        count = rebuild_related_index()
+        self.stdout.write(self.style.SUCCESS(f'{count} liens entre articles enregistrés'))
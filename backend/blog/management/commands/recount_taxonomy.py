@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from blog.taxonomy import refresh_category_counts, refresh_tag_counts
+
+
+class Command(BaseCommand):
+    help = "Recalcule entièrement les compteurs d'articles des catégories et des tags"
+
+    def handle(self, *args, **options):
+        refresh_category_counts()
+        refresh_tag_counts()
+        self.stdout.write(self.style.SUCCESS('Compteurs recalculés'))
@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.rankings import refresh_rankings
+
+
+class Command(BaseCommand):
+    help = 'Recalcule les classements des articles populaires et tendance'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=int, default=0,
+            help='Relance le calcul toutes les N secondes (0 : un seul passage)'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            for feed, count in refresh_rankings().items():
+                self.stdout.write(f'{feed} : {count} article(s) classé(s)')
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import Article
+
+
+class Command(BaseCommand):
+    help = 'Génère le HTML des articles dont le rendu est absent ou obsolète'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Refait le rendu de tous les articles (ex. après un changement des règles)'
+        )
+
+    def handle(self, *args, **options):
+        articles = Article.objects.all()
+        if not options['force']:
+            articles = articles.filter(content_hash='')
+
+        count = 0
+        for article in articles.iterator(chunk_size=200):
+            changed = article.render_content(force=options['force'])
+            if changed:
+                Article.objects.filter(pk=article.pk).update(
+                    **{field: getattr(article, field) for field in changed}
+                )
+                count += 1
+        self.stdout.write(self.style.SUCCESS(f'{count} article(s) rendu(s)'))
@@ -0,0 +1,17 @@
+"""Compteurs applicatifs en mémoire du processus, exposés par /api/metrics/"""
+import threading
+from collections import Counter
+
+_counters = Counter()
+_lock = threading.Lock()
+
+
+def increment(name, value=1):
+    with _lock:
+        _counters[name] += value
+
+
+def snapshot():
+    """Retourne une copie des compteurs courants"""
+    with _lock:
+        return dict(_counters)
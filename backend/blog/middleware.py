@@ -0,0 +1,122 @@
+import hashlib
+import logging
+import random
+
+from django.conf import settings
+from django.core.cache import cache
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+from django.utils.regex_helper import _lazy_re_compile
+
+from .db_routers import replica_alias
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+re_accepts_brotli = _lazy_re_compile(r'\bbr\b')
+
+logger = logging.getLogger(__name__)
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    Compresse les réponses en Brotli ou gzip selon Accept-Encoding.
+
+    Brotli (optionnel) est préféré pour les réponses non streamées de l'API
+    et des flux (sous /api/), hors HTML ; gzip est utilisé sinon. Le HTML
+    (admin, API navigable) passe toujours par GZipMiddleware, dont les
+    octets aléatoires protègent contre BREACH ; Brotli n'en ajoute pas.
+    Les réponses plus petites que API_COMPRESSION_MIN_SIZE octets sont
+    envoyées telles quelles.
+    """
+    brotli_path_prefix = '/api/'
+
+    def accepts_brotli(self, request, response):
+        return (
+            brotli is not None
+            and not response.streaming
+            and request.path.startswith(self.brotli_path_prefix)
+            and not response.get('Content-Type', '').startswith('text/html')
+            and re_accepts_brotli.search(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        )
+
+    def process_response(self, request, response):
+        if not response.streaming and len(response.content) < settings.API_COMPRESSION_MIN_SIZE:
+            return response
+        if response.has_header('Content-Encoding'):
+            return response
+
+        if not self.accepts_brotli(request, response):
+            return super().process_response(request, response)
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        compressed_content = brotli.compress(
+            response.content, quality=settings.API_COMPRESSION_BROTLI_QUALITY
+        )
+        if len(compressed_content) >= len(response.content):
+            return response
+        response.content = compressed_content
+        response.headers['Content-Length'] = str(len(response.content))
+
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = 'br'
+        return response
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Envoie les lectures des requêtes GET/HEAD/OPTIONS de l'API vers les réplicas.
+
+    Après une écriture réussie, le client (identifié par son en-tête
+    Authorization, ou son IP à défaut) reste sur le primaire pendant
+    DATABASE_REPLICA_STICKY_SECONDS pour relire ce qu'il vient d'écrire.
+    Ce maintien est stocké dans le cache partagé (voir CACHE_URL et la
+    vérification blog.E001) pour valoir quel que soit le processus qui
+    reçoit la requête suivante ; si le cache ne répond pas, les lectures
+    restent sur le primaire.
+    """
+    safe_methods = ('GET', 'HEAD', 'OPTIONS')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def pin_key(self, request):
+        client = request.META.get('HTTP_AUTHORIZATION') or request.META.get('REMOTE_ADDR', '')
+        return 'db:pin:' + hashlib.sha1(client.encode()).hexdigest()
+
+    def is_pinned(self, key):
+        try:
+            return bool(cache.get(key))
+        except Exception:
+            logger.warning('Cache indisponible, lecture sur le primaire')
+            return True
+
+    def pin(self, key):
+        try:
+            cache.set(key, True, settings.DATABASE_REPLICA_STICKY_SECONDS)
+        except Exception:
+            logger.warning('Cache indisponible, maintien sur le primaire non enregistré')
+
+    def __call__(self, request):
+        if not request.path.startswith(settings.DATABASE_REPLICA_PATH_PREFIX):
+            return self.get_response(request)
+
+        safe = request.method in self.safe_methods
+        key = self.pin_key(request)
+        alias = None
+        if safe and settings.DATABASE_REPLICA_ALIASES and not self.is_pinned(key):
+            # Un seul réplica par requête, pour des lectures cohérentes entre elles
+            alias = random.choice(settings.DATABASE_REPLICA_ALIASES)
+        token = replica_alias.set(alias)
+        try:
+            response = self.get_response(request)
+        finally:
+            replica_alias.reset(token)
+
+        if not safe and response.status_code < 400:
+            self.pin(key)
+        return response
@@ -1,15 +1,18 @@
+from django.conf import settings
 from django.db import models
 from django.contrib.auth.models import User
-from django.utils.text import slugify
-from django.urls import reverse
 from django.utils import timezone
+from .rendering import content_hash, make_excerpt, render_content
+from .slugs import UniqueSlugMixin
 
 
-class Category(models.Model):
+class Category(UniqueSlugMixin, models.Model):
     name = models.CharField(max_length=100, unique=True)
     slug = models.SlugField(max_length=100, unique=True)
     description = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Nombre d'articles publiés, maintenu par blog.taxonomy
+    article_count = models.PositiveIntegerField(default=0, db_index=True, editable=False)
     
     class Meta:
         verbose_name_plural = 'Categories'
@@ -17,32 +20,52 @@ class Category(models.Model):
     
     def __str__(self):
         return self.name
-    
-    def save(self, *args, **kwargs):
-        if not self.slug:
-            self.slug = slugify(self.name)
-        super().save(*args, **kwargs)
 
 
-class Tag(models.Model):
+class Tag(UniqueSlugMixin, models.Model):
     name = models.CharField(max_length=50, unique=True)
     slug = models.SlugField(max_length=50, unique=True)
+    # Nombre d'articles publiés, maintenu par blog.taxonomy
+    article_count = models.PositiveIntegerField(default=0, db_index=True, editable=False)
     
     class Meta:
         ordering = ['name']
     
     def __str__(self):
         return self.name
+
+
+class ArticleQuerySet(models.QuerySet):
+    def published(self):
+        """Articles visibles publiquement : publiés et dont la date est passée"""
+        return self.filter(status='published', published_at__lte=timezone.now())
     
-    def save(self, *args, **kwargs):
-        if not self.slug:
-            self.slug = slugify(self.name)
-        super().save(*args, **kwargs)
+    def due(self):
+        """Articles programmés dont la date de publication est atteinte"""
+        return self.filter(status='scheduled', published_at__lte=timezone.now())
+
+
+class CounterField(models.PositiveIntegerField):
+    """
+    Compteur incrémenté par des UPDATE en base (voir blog.view_counter).
+
+    save() n'écrit la valeur qu'à l'insertion : sur une ligne existante, la
+    colonne est réécrite avec elle-même, pour ne pas remplacer les vues
+    comptées depuis le chargement de l'instance par une valeur périmée.
+    """
 
+    def pre_save(self, model_instance, add):
+        if add:
+            return super().pre_save(model_instance, add)
+        return models.F(self.attname)
 
-class Article(models.Model):
+
+class Article(UniqueSlugMixin, models.Model):
+    slug_source = 'title'
+    
     STATUS_CHOICES = [
         ('draft', 'Brouillon'),
+        ('scheduled', 'Programmé'),
         ('published', 'Publié'),
     ]
     
@@ -52,6 +75,11 @@ class Article(models.Model):
     excerpt = models.TextField(blank=True, max_length=500)
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='draft')
     
+    # Rendu HTML du contenu, recalculé seulement quand content_hash change
+    content_html = models.TextField(blank=True, editable=False)
+    content_toc = models.JSONField(default=list, blank=True, editable=False)
+    content_hash = models.CharField(max_length=64, blank=True, editable=False)
+    
     # Dates
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -71,27 +99,78 @@ class Article(models.Model):
     ai_score = models.FloatField(null=True, blank=True)
     ai_feedback = models.TextField(blank=True)
     
+    # Écrit uniquement par blog.view_counter, jamais par save()
+    view_count = CounterField(default=0, db_index=True, editable=False)
+    
+    objects = ArticleQuerySet.as_manager()
+    
     class Meta:
         ordering = ['-published_at', '-created_at']
+        indexes = [
+            # Utilisé par les listes publiques et par publish_scheduled
+            models.Index(fields=['status', 'published_at']),
+            # Tri et recherche par préfixe de l'admin
+            models.Index(fields=['-created_at']),
+            models.Index(fields=['title']),
+        ]
     
     def __str__(self):
         return self.title
     
     def save(self, *args, **kwargs):
-        if not self.slug:
-            self.slug = slugify(self.title)
+        self.normalize_status()
+        rendered_fields = self.render_content()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and rendered_fields:
+            kwargs['update_fields'] = set(update_fields) | set(rendered_fields)
         
+        super().save(*args, **kwargs)
+    
+    def normalize_status(self):
+        """Accorde le statut et la date de publication (aussi appelé par l'import en masse)"""
+        now = timezone.now()
         if self.status == 'published' and not self.published_at:
-            self.published_at = timezone.now()
+            self.published_at = now
         
-        super().save(*args, **kwargs)
+        # Une date de publication future programme l'article au lieu de le publier
+        if self.status == 'published' and self.published_at > now:
+            self.status = 'scheduled'
+        elif self.status == 'scheduled' and self.published_at and self.published_at <= now:
+            self.status = 'published'
+    
+    def render_content(self, force=False):
+        """
+        Met à jour le HTML, la table des matières et l'extrait si le contenu a changé.
+        L'extrait n'est régénéré que s'il était vide ou généré automatiquement.
+        Retourne les champs modifiés.
+        """
+        changed = []
+        digest = content_hash(self.content)
+        if force or digest != self.content_hash:
+            # Un extrait identique à celui généré depuis l'ancien HTML n'a pas
+            # été saisi par l'auteur : il est régénéré avec le nouveau contenu
+            if self.excerpt and self.content_html and self.excerpt == make_excerpt(self.content_html):
+                self.excerpt = ''
+            self.content_html, self.content_toc = render_content(self.content)
+            self.content_hash = digest
+            changed += ['content_html', 'content_toc', 'content_hash']
+        
+        if not self.excerpt and self.content_html:
+            self.excerpt = make_excerpt(self.content_html)
+            changed.append('excerpt')
+        return changed
     
     def get_absolute_url(self):
-        return reverse('article-detail', kwargs={'slug': self.slug})
+        # Page de l'article sur le frontend
+        return f'{settings.SITE_URL}/articles/{self.slug}'
     
     @property
     def is_published(self):
-        return self.status == 'published' and self.published_at is not None
+        return (
+            self.status == 'published'
+            and self.published_at is not None
+            and self.published_at <= timezone.now()
+        )
     
     @property
     def reading_time(self):
@@ -109,8 +188,163 @@ class Comment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     is_approved = models.BooleanField(default=False)
     
+    MODERATION_CHOICES = [
+        ('pending', 'En attente'),
+        ('processing', 'En cours'),
+        ('approved', 'Approuvé'),
+        ('flagged', 'Signalé'),
+        ('review', 'À relire'),
+    ]
+    
+    # Modération automatique (voir blog.moderation)
+    moderation_status = models.CharField(max_length=10, choices=MODERATION_CHOICES, default='pending')
+    moderation_confidence = models.FloatField(null=True, blank=True)
+    moderation_reason = models.TextField(blank=True)
+    # Date de prise en charge par un worker, tant que le statut est 'processing'
+    moderation_claimed_at = models.DateTimeField(null=True, blank=True, editable=False)
+    
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # File d'attente du worker de modération
+            models.Index(fields=['moderation_status', 'created_at']),
+            # Tri de l'admin
+            models.Index(fields=['-created_at']),
+        ]
     
     def __str__(self):
         return f'Comment by {self.author_name} on {self.article.title}'
+
+
+class ArticleRevision(models.Model):
+    """
+    Version du texte d'un article (voir blog.revisions).
+    
+    data contient, compressé, soit le texte complet (is_snapshot), soit les
+    différences avec la révision précédente.
+    """
+    article = models.ForeignKey(Article, on_delete=models.CASCADE, related_name='revisions')
+    number = models.PositiveIntegerField()
+    title = models.CharField(max_length=200)
+    is_snapshot = models.BooleanField(default=False)
+    data = models.BinaryField()
+    text_hash = models.CharField(max_length=64)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['article', '-number']
+        unique_together = [('article', 'number')]
+    
+    def __str__(self):
+        return f'{self.article_id} v{self.number}'
+
+
+class SectionCheck(models.Model):
+    """Résultat de la vérification IA d'une section d'article, par empreinte"""
+    section_hash = models.CharField(max_length=64, unique=True)
+    score = models.FloatField(null=True, blank=True)
+    feedback = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return f'{self.section_hash[:12]} ({self.score})'
+
+
+class ModerationVerdict(models.Model):
+    """Verdicts de modération déjà obtenus, par empreinte du texte normalisé"""
+    text_hash = models.CharField(max_length=64, unique=True)
+    appropriate = models.BooleanField()
+    confidence = models.FloatField()
+    reason = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        verdict = 'ok' if self.appropriate else 'refusé'
+        return f'{self.text_hash[:12]} {verdict} ({self.confidence:.2f})'
+
+
+class ArticleViewStat(models.Model):
+    """Vues agrégées par article et par jour (voir blog.view_counter)"""
+    article = models.ForeignKey(Article, on_delete=models.CASCADE, related_name='view_stats')
+    date = models.DateField()
+    views = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        unique_together = [('article', 'date')]
+        indexes = [models.Index(fields=['date'])]
+    
+    def __str__(self):
+        return f'{self.article_id} {self.date}: {self.views}'
+
+
+class ArticleRanking(models.Model):
+    """Classements précalculés des articles populaires et tendance (voir blog.rankings)"""
+    FEED_CHOICES = [
+        ('popular', 'Populaires'),
+        ('trending', 'Tendance'),
+    ]
+    
+    feed = models.CharField(max_length=10, choices=FEED_CHOICES)
+    position = models.PositiveSmallIntegerField()
+    article = models.ForeignKey(Article, on_delete=models.CASCADE, related_name='rankings')
+    score = models.FloatField()
+    computed_at = models.DateTimeField()
+    
+    class Meta:
+        ordering = ['feed', 'position']
+        unique_together = [('feed', 'position'), ('feed', 'article')]
+    
+    def __str__(self):
+        return f'{self.feed} #{self.position}: {self.article_id} ({self.score:.2f})'
+
+
+class RelatedArticle(models.Model):
+    """Index précalculé des articles similaires (voir blog.related)"""
+    article = models.ForeignKey(Article, on_delete=models.CASCADE, related_name='related_entries')
+    related = models.ForeignKey(Article, on_delete=models.CASCADE, related_name='related_to')
+    score = models.FloatField()
+    
+    class Meta:
+        ordering = ['-score']
+        unique_together = [('article', 'related')]
+        indexes = [models.Index(fields=['article', '-score'])]
+    
+    def __str__(self):
+        return f'{self.article_id} -> {self.related_id} ({self.score:.3f})'
+
+
+class SimilarityTerm(models.Model):
+    """Vocabulaire et IDF de l'index des articles similaires (voir blog.related)"""
+    term = models.CharField(max_length=100, unique=True)
+    column = models.PositiveIntegerField(unique=True)
+    idf = models.FloatField()
+    
+    class Meta:
+        ordering = ['column']
+    
+    def __str__(self):
+        return f'{self.column}: {self.term}'
+
+
+class ArticleVector(models.Model):
+    """Vecteur TF-IDF creux d'un article publié (voir blog.related)"""
+    article = models.OneToOneField(
+        Article, on_delete=models.CASCADE, primary_key=True, related_name='similarity_vector'
+    )
+    data = models.BinaryField()
+    
+    def __str__(self):
+        return f'Vecteur de {self.article_id}'
+
+
+class RelatedUpdate(models.Model):
+    """Article dont les voisins restent à recalculer (voir blog.related)"""
+    # Pas de clé étrangère : la demande survit à la suppression de l'article
+    article_id = models.BigIntegerField(primary_key=True)
+    requested_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['requested_at']
+    
+    def __str__(self):
+        return f'Mise à jour des voisins de {self.article_id}'
@@ -0,0 +1,163 @@
+"""
+Modération automatique des commentaires (voir la commande moderate_comments).
+
+Les commentaires en attente sont traités par lots : les textes déjà jugés
+(même texte normalisé) reprennent le verdict enregistré dans
+ModerationVerdict, les autres sont envoyés ensemble en une seule requête à
+l'IA. Un verdict sûr approuve ou signale le commentaire selon les seuils
+COMMENT_MODERATION_*_THRESHOLD ; sinon le commentaire est laissé à relire
+par un administrateur.
+
+Aucun verrou n'est gardé pendant l'appel à l'IA : un lot est d'abord pris en
+charge (statut 'processing') dans une transaction courte, puis les verdicts
+sont écrits dans une seconde transaction courte, seulement pour les
+commentaires qu'un administrateur n'a pas traités entre-temps.
+"""
+import hashlib
+import logging
+import re
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import metrics
+from .models import Comment, ModerationVerdict
+
+logger = logging.getLogger(__name__)
+
+WHITESPACE_RE = re.compile(r'\s+')
+
+
+def text_hash(text):
+    """Empreinte du texte, insensible à la casse et aux espaces"""
+    normalized = WHITESPACE_RE.sub(' ', text).strip().lower()
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+def apply_verdict(comment, verdict):
+    """Met à jour le statut du commentaire selon le verdict et les seuils"""
+    comment.moderation_confidence = verdict.confidence
+    comment.moderation_reason = verdict.reason
+    if verdict.appropriate and verdict.confidence >= settings.COMMENT_MODERATION_APPROVE_THRESHOLD:
+        comment.moderation_status = 'approved'
+        comment.is_approved = True
+    elif not verdict.appropriate and verdict.confidence >= settings.COMMENT_MODERATION_FLAG_THRESHOLD:
+        comment.moderation_status = 'flagged'
+    else:
+        comment.moderation_status = 'review'
+
+
+def get_verdicts(texts):
+    """
+    Retourne {empreinte: ModerationVerdict} pour les textes donnés.
+
+    Les textes inconnus sont envoyés à l'IA en une seule requête ; ceux
+    qu'elle n'a pas pu juger sont absents du résultat.
+    """
+    hashes = {text_hash(text): text for text in texts}
+    verdicts = {
+        verdict.text_hash: verdict
+        for verdict in ModerationVerdict.objects.filter(text_hash__in=hashes)
+    }
+    metrics.increment('moderation.cache_hits', len(verdicts))
+
+    unknown = [h for h in hashes if h not in verdicts]
+    if unknown:
+        from ai_content_checker.services import AIContentChecker
+
+        results = AIContentChecker().moderate_comments([hashes[h] for h in unknown])
+        metrics.increment('moderation.ai_requests')
+        new = [
+            ModerationVerdict(text_hash=h, **result)
+            for h, result in zip(unknown, results) if result is not None
+        ]
+        ModerationVerdict.objects.bulk_create(new, ignore_conflicts=True)
+        verdicts.update((verdict.text_hash, verdict) for verdict in new)
+    return verdicts
+
+
+def claim_batch(batch_size, claimed_at):
+    """
+    Prend en charge un lot de commentaires en attente ; retourne leurs ids.
+
+    SKIP LOCKED permet à plusieurs workers de tourner en parallèle. Les lots
+    pris depuis plus de COMMENT_MODERATION_CLAIM_TIMEOUT secondes (worker
+    arrêté en cours de route) sont repris.
+    """
+    expired = claimed_at - timedelta(seconds=settings.COMMENT_MODERATION_CLAIM_TIMEOUT)
+    with transaction.atomic():
+        ids = list(
+            # Les commentaires déjà approuvés à la main ne sont pas remis en cause
+            Comment.objects.filter(
+                Q(moderation_status='pending')
+                | Q(moderation_status='processing', moderation_claimed_at__lt=expired),
+                is_approved=False,
+            )
+            .order_by('created_at')
+            .select_for_update(skip_locked=True)
+            .values_list('pk', flat=True)[:batch_size]
+        )
+        Comment.objects.filter(pk__in=ids).update(
+            moderation_status='processing', moderation_claimed_at=claimed_at
+        )
+    return ids
+
+
+def moderate_batch(batch_size=None):
+    """
+    Modère un lot de commentaires en attente ; retourne le nombre traité.
+
+    Les commentaires que l'IA n'a pas jugés, ou tous ceux du lot si l'appel
+    échoue, sont remis en attente pour le passage suivant.
+    """
+    batch_size = batch_size or settings.COMMENT_MODERATION_BATCH_SIZE
+    claimed_at = timezone.now()
+    ids = claim_batch(batch_size, claimed_at)
+    if not ids:
+        return 0
+
+    comments = list(Comment.objects.filter(pk__in=ids).only('pk', 'content'))
+    moderated = {}
+    try:
+        verdicts = get_verdicts(comment.content for comment in comments)
+        for comment in comments:
+            verdict = verdicts.get(text_hash(comment.content))
+            if verdict is not None:
+                apply_verdict(comment, verdict)
+                comment.moderation_claimed_at = None
+                moderated[comment.pk] = comment
+    finally:
+        with transaction.atomic():
+            # Seuls les commentaires encore pris en charge par ce lot sont écrits
+            claimed = Comment.objects.select_for_update().filter(
+                pk__in=ids, moderation_status='processing', moderation_claimed_at=claimed_at
+            )
+            rows = dict(claimed.values_list('pk', 'is_approved'))
+            # Approuvés à la main pendant l'appel à l'IA : leur décision est gardée
+            approved = {pk for pk, is_approved in rows.items() if is_approved}
+            written = [moderated[pk] for pk in rows if pk in moderated and pk not in approved]
+            Comment.objects.bulk_update(written, [
+                'moderation_status', 'moderation_confidence', 'moderation_reason',
+                'is_approved', 'moderation_claimed_at',
+            ])
+            claimed.filter(pk__in=approved).update(
+                moderation_status='approved', moderation_claimed_at=None
+            )
+            # Restent ceux que l'IA n'a pas jugés
+            claimed.update(moderation_status='pending', moderation_claimed_at=None)
+    return len(written)
+
+
+def moderate_pending_comments(batch_size=None):
+    """Modère les commentaires en attente par lots, jusqu'à ce qu'un lot n'avance plus"""
+    total = 0
+    while True:
+        count = moderate_batch(batch_size)
+        if not count:
+            return total
+        total += count
+        logger.info('%d commentaire(s) modéré(s)', count)
@@ -12,7 +12,8 @@ class IsAuthorOrReadOnly(permissions.BasePermission):
             return True
         
         # Écriture autorisée seulement pour l'auteur ou les admins
-        return obj.author == request.user or request.user.is_staff
+        # Comparaison des ids pour ne pas charger l'auteur de l'objet
+        return obj.author_id == request.user.id or request.user.is_staff
 
 
 class IsCommentAuthorOrReadOnly(permissions.BasePermission):
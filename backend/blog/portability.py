@@ -0,0 +1,342 @@
+"""
+Export et import des articles en flux (voir export_articles et import_articles).
+
+Le format est du JSON par ligne, compressé en gzip si le fichier se termine
+par .gz. Les catégories, tags et auteurs sont référencés par clé naturelle
+(slug ou nom d'utilisateur), jamais par id, pour pouvoir importer dans une
+autre base :
+
+    {"model": "category", "slug": ..., "name": ..., "description": ...}
+    {"model": "tag", "slug": ..., "name": ...}
+    {"model": "user", "username": ..., "first_name": ..., ...}
+    {"model": "article", "slug": ..., "author": "<username>",
+     "category": "<slug>", "tags": ["<slug>", ...], "comments": [...], ...}
+
+L'export parcourt les articles par pages de clés (pk > dernier pk), sans
+OFFSET ni chargement complet. L'import insère par lots avec bulk_create, en
+différant les contrôles de contraintes, et ignore les articles dont le slug
+existe déjà. Une catégorie ou un tag déjà présent sous le même nom mais un
+autre slug est réutilisé ; une clé naturelle impossible à résoudre lève
+ImportConflictError avant l'écriture du lot concerné.
+"""
+import gzip
+import json
+from contextlib import contextmanager
+
+from django.contrib.auth.models import User
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils.dateparse import parse_datetime
+
+from .models import Article, Category, Comment, Tag
+from .related import rebuild_related_index
+from .syndication import invalidate_published
+from .taxonomy import refresh_category_counts, refresh_tag_counts
+
+ARTICLE_FIELDS = [
+    'slug', 'title', 'content', 'excerpt', 'status', 'created_at', 'updated_at',
+    'published_at', 'featured_image', 'meta_description', 'ai_checked', 'ai_score',
+    'ai_feedback',
+]
+COMMENT_FIELDS = ['author_name', 'author_email', 'content', 'created_at', 'is_approved']
+USER_FIELDS = ['username', 'first_name', 'last_name', 'email']
+DATE_FIELDS = ('created_at', 'updated_at', 'published_at')
+
+
+def open_dump(path, mode):
+    """Ouvre le fichier en texte, compressé si son nom se termine par .gz"""
+    if path.endswith('.gz'):
+        return gzip.open(path, f'{mode}t', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+# Export
+
+def iter_records(chunk_size=500):
+    """Produit les enregistrements à exporter, taxonomie et auteurs d'abord"""
+    for category in Category.objects.order_by('pk').values('slug', 'name', 'description').iterator():
+        yield {'model': 'category', **category}
+    for tag in Tag.objects.order_by('pk').values('slug', 'name').iterator():
+        yield {'model': 'tag', **tag}
+    authors = User.objects.filter(pk__in=Article.objects.values('author_id')).order_by('pk')
+    for user in authors.values(*USER_FIELDS).iterator():
+        yield {'model': 'user', **user}
+
+    last_pk = 0
+    while True:
+        rows = list(
+            Article.objects.filter(pk__gt=last_pk).order_by('pk').values(
+                'pk', *ARTICLE_FIELDS,
+                author_key=F('author__username'), category_key=F('category__slug'),
+            )[:chunk_size]
+        )
+        if not rows:
+            return
+        ids = [row['pk'] for row in rows]
+        last_pk = ids[-1]
+
+        tags = {pk: [] for pk in ids}
+        for article_id, slug in Article.tags.through.objects.filter(
+            article_id__in=ids
+        ).order_by('tag__slug').values_list('article_id', 'tag__slug'):
+            tags[article_id].append(slug)
+
+        comments = {pk: [] for pk in ids}
+        for comment in Comment.objects.filter(article_id__in=ids).order_by('pk').values(
+            'article_id', *COMMENT_FIELDS
+        ):
+            comments[comment.pop('article_id')].append(comment)
+
+        for row in rows:
+            pk = row.pop('pk')
+            row['author'] = row.pop('author_key')
+            row['category'] = row.pop('category_key')
+            yield {'model': 'article', **row, 'tags': tags[pk], 'comments': comments[pk]}
+
+
+def export_articles(path, chunk_size=500):
+    """Écrit la sauvegarde ; retourne le nombre d'articles exportés"""
+    count = 0
+    with open_dump(path, 'w') as f:
+        for record in iter_records(chunk_size):
+            f.write(json.dumps(record, cls=DjangoJSONEncoder, ensure_ascii=False))
+            f.write('\n')
+            count += record['model'] == 'article'
+    return count
+
+
+# Import
+
+class ImportConflictError(ValueError):
+    """La sauvegarde référence des clés naturelles incompatibles avec la base"""
+
+
+def create_taxonomy(model, records):
+    """
+    Crée les catégories ou tags manquants ; retourne {slug de la sauvegarde: pk}.
+
+    Le nom et le slug sont tous deux uniques : une ligne existante de même
+    nom mais de slug différent est réutilisée. Une entrée dont le slug et le
+    nom désignent deux lignes différentes est refusée avant toute écriture.
+    """
+    slugs = [data['slug'] for data in records]
+    names = [data['name'] for data in records]
+
+    def existing():
+        rows = list(
+            model.objects.filter(Q(slug__in=slugs) | Q(name__in=names))
+            .values_list('pk', 'slug', 'name')
+        )
+        return {slug: pk for pk, slug, _ in rows}, {name: pk for pk, _, name in rows}
+
+    by_slug, by_name = existing()
+    conflicts = [
+        f"{data['slug']} / {data['name']}" for data in records
+        if data['slug'] in by_slug and data['name'] in by_name
+        and by_slug[data['slug']] != by_name[data['name']]
+    ]
+    if conflicts:
+        raise ImportConflictError(
+            f'{model._meta.verbose_name_plural} : le slug et le nom désignent deux lignes '
+            f'différentes de la base : {", ".join(conflicts)}'
+        )
+
+    # Dédoublonnage par slug et par nom, les deux étant uniques
+    missing = {}
+    missing_names = set()
+    for data in records:
+        if (data['slug'] in by_slug or data['slug'] in missing
+                or data['name'] in by_name or data['name'] in missing_names):
+            continue
+        missing[data['slug']] = data
+        missing_names.add(data['name'])
+    model.objects.bulk_create([model(**data) for data in missing.values()], ignore_conflicts=True)
+
+    by_slug, by_name = existing()
+    return {
+        data['slug']: by_slug.get(data['slug'], by_name.get(data['name']))
+        for data in records
+    }
+
+
+@contextmanager
+def deferred_constraint_checks():
+    """
+    Diffère les contrôles de contraintes le temps d'un lot d'insertions.
+
+    MySQL : foreign_key_checks et unique_checks sont coupés pour la session,
+    ce qui évite les vérifications ligne par ligne ; les lots sont dédoublonnés
+    en amont. SQLite et PostgreSQL vérifient les clés étrangères au commit.
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == 'mysql':
+            cursor.execute('SET foreign_key_checks = 0, unique_checks = 0')
+        elif connection.vendor == 'sqlite':
+            cursor.execute('PRAGMA defer_foreign_keys = ON')
+        elif connection.vendor == 'postgresql':
+            cursor.execute('SET CONSTRAINTS ALL DEFERRED')
+    try:
+        yield
+    finally:
+        if connection.vendor == 'mysql':
+            with connection.cursor() as cursor:
+                cursor.execute('SET foreign_key_checks = 1, unique_checks = 1')
+
+
+@contextmanager
+def preserved_auto_dates(*models):
+    """bulk_create applique auto_now/auto_now_add : on les coupe pour garder les dates importées"""
+    fields = [
+        field for model in models for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class ArticleImporter:
+    """Importe une sauvegarde en flux, par lots de batch_size articles"""
+
+    def __init__(self, batch_size=500):
+        self.batch_size = batch_size
+        self.category_ids = {}
+        self.tag_ids = {}
+        self.user_ids = {}
+        self.pending = {'category': [], 'tag': [], 'user': []}
+        self.articles = []
+        self.imported_ids = []
+        self.skipped = 0
+
+    def add(self, record):
+        model = record.pop('model')
+        if model == 'article':
+            self.flush_natural_keys()
+            self.articles.append(record)
+            if len(self.articles) >= self.batch_size:
+                self.flush_articles()
+        else:
+            self.pending[model].append(record)
+            if len(self.pending[model]) >= self.batch_size:
+                self.flush_natural_keys()
+
+    def flush_natural_keys(self):
+        """Crée les catégories, tags et auteurs manquants et mémorise leurs ids"""
+        pending, self.pending = self.pending, {'category': [], 'tag': [], 'user': []}
+        if pending['category']:
+            self.category_ids.update(create_taxonomy(Category, pending['category']))
+        if pending['tag']:
+            self.tag_ids.update(create_taxonomy(Tag, pending['tag']))
+        if pending['user']:
+            # Les comptes créés n'ont pas de mot de passe utilisable
+            users = []
+            for data in pending['user']:
+                user = User(**data)
+                user.set_unusable_password()
+                users.append(user)
+            User.objects.bulk_create(users, ignore_conflicts=True)
+            usernames = [data['username'] for data in pending['user']]
+            self.user_ids.update(
+                User.objects.filter(username__in=usernames).values_list('username', 'pk')
+            )
+
+    def flush_articles(self):
+        records, self.articles = self.articles, []
+        if not records:
+            return
+        existing = set(
+            Article.objects.filter(slug__in=[r['slug'] for r in records])
+            .values_list('slug', flat=True)
+        )
+        records = [r for r in records if r['slug'] not in existing]
+        self.skipped += len(existing)
+        # Dédoublonnage dans le lot, nécessaire avec unique_checks désactivé
+        records = list({r['slug']: r for r in records}.values())
+        if not records:
+            return
+        self.check_natural_keys(records)
+
+        articles = []
+        for record in records:
+            article = Article(
+                author_id=self.user_ids[record['author']],
+                category_id=self.category_ids.get(record['category']),
+                **{field: record[field] for field in ARTICLE_FIELDS},
+            )
+            for field in DATE_FIELDS:
+                if record[field]:
+                    setattr(article, field, parse_datetime(record[field]))
+            # bulk_create ne passe pas par save() : statut et rendu HTML faits ici
+            article.normalize_status()
+            article.render_content()
+            articles.append(article)
+
+        with transaction.atomic(), deferred_constraint_checks():
+            with preserved_auto_dates(Article, Comment):
+                Article.objects.bulk_create(articles, batch_size=self.batch_size)
+                # MySQL ne renvoie pas les ids créés : relecture par slug
+                ids = dict(
+                    Article.objects.filter(slug__in=[r['slug'] for r in records])
+                    .values_list('slug', 'pk')
+                )
+                Article.tags.through.objects.bulk_create([
+                    Article.tags.through(article_id=ids[r['slug']], tag_id=self.tag_ids[slug])
+                    for r in records for slug in r['tags']
+                ], batch_size=self.batch_size)
+                Comment.objects.bulk_create([
+                    Comment(
+                        article_id=ids[r['slug']],
+                        **{**comment, 'created_at': parse_datetime(comment['created_at'])},
+                    )
+                    for r in records for comment in r['comments']
+                ], batch_size=self.batch_size)
+        self.imported_ids.extend(ids.values())
+
+    def check_natural_keys(self, records):
+        """
+        Vérifie, avant d'écrire le lot, que ses auteurs, catégories et tags
+        sont connus ; ceux absents de la sauvegarde sont cherchés en base.
+        """
+        references = (
+            ('auteur', self.user_ids, User, 'username', {r['author'] for r in records}),
+            ('catégorie', self.category_ids, Category, 'slug',
+             {r['category'] for r in records if r['category']}),
+            ('tag', self.tag_ids, Tag, 'slug', {slug for r in records for slug in r['tags']}),
+        )
+        unknown = []
+        for label, ids, model, field, keys in references:
+            keys -= ids.keys()
+            if keys:
+                ids.update(model.objects.filter(**{f'{field}__in': keys}).values_list(field, 'pk'))
+            unknown.extend(f'{label} {key}' for key in sorted(keys - ids.keys()))
+        if unknown:
+            raise ImportConflictError(
+                f'Références introuvables dans la sauvegarde et la base : {", ".join(unknown)}'
+            )
+
+    def finish(self):
+        """Écrit le dernier lot et recalcule les données dérivées ignorées par bulk_create"""
+        self.flush_natural_keys()
+        self.flush_articles()
+        if self.imported_ids:
+            refresh_category_counts()
+            refresh_tag_counts()
+            rebuild_related_index()
+            invalidate_published(self.imported_ids, self.category_ids.values(), self.tag_ids.values())
+        return len(self.imported_ids), self.skipped
+
+
+def import_articles(path, batch_size=500):
+    """Importe une sauvegarde ; retourne (articles importés, articles ignorés)"""
+    importer = ArticleImporter(batch_size)
+    with open_dump(path, 'r') as f:
+        for line in f:
+            if line.strip():
+                importer.add(json.loads(line))
+    return importer.finish()
@@ -0,0 +1,99 @@
+"""
+Classements des articles populaires et tendance.
+
+Le score d'un article additionne ses vues (ArticleViewStat), ses commentaires
+approuvés et un bonus de fraîcheur, chaque événement étant pondéré par une
+décroissance exponentielle : il compte moitié moins tous les half_life jours.
+Seule l'activité de la fenêtre du classement est lue, si bien que le calcul
+dépend du trafic récent et non de la taille des archives. Les meilleurs
+articles sont écrits dans ArticleRanking, lu tel quel par l'API.
+"""
+from collections import Counter, defaultdict
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Article, ArticleRanking, ArticleViewStat, Comment
+
+# Fenêtre (jours) et demi-vie (jours) de chaque classement
+FEEDS = {
+    'popular': {'days': 30, 'half_life': 7},
+    'trending': {'days': 7, 'half_life': 1},
+}
+
+
+def _decay(age_days, half_life):
+    return 0.5 ** (max(age_days, 0) / half_life)
+
+
+def compute_scores(feed, now=None):
+    """Retourne {article_id: score} pour les articles publiés actifs dans la fenêtre"""
+    now = now or timezone.now()
+    today = timezone.localdate(now)
+    days, half_life = FEEDS[feed]['days'], FEEDS[feed]['half_life']
+    since = today - timedelta(days=days - 1)
+    # Bornes en datetime aware plutôt que __date / TruncDate : sur MySQL, ceux-ci
+    # passent par CONVERT_TZ, qui renvoie NULL sans tables de fuseaux chargées
+    window_start = timezone.make_aware(datetime.combine(since, time.min))
+    published = Article.objects.published()
+    scores = defaultdict(float)
+
+    views = ArticleViewStat.objects.filter(
+        date__gte=since, article__in=published
+    ).values_list('article_id', 'date', 'views')
+    for article_id, day, count in views:
+        scores[article_id] += count * _decay((today - day).days, half_life)
+
+    # Les commentaires sont regroupés par jour local ici, pas en SQL
+    comment_days = Counter(
+        (article_id, timezone.localdate(created_at))
+        for article_id, created_at in Comment.objects.filter(
+            is_approved=True, created_at__gte=window_start, article__in=published
+        ).values_list('article_id', 'created_at').iterator()
+    )
+    for (article_id, day), count in comment_days.items():
+        scores[article_id] += (
+            settings.RANKING_COMMENT_WEIGHT * count * _decay((today - day).days, half_life)
+        )
+
+    recent = published.filter(published_at__gte=window_start).values_list('pk', 'published_at')
+    for article_id, published_at in recent:
+        age_days = (now - published_at).total_seconds() / 86400
+        scores[article_id] += settings.RANKING_RECENCY_WEIGHT * _decay(age_days, half_life)
+
+    return scores
+
+
+def refresh_ranking(feed, now=None):
+    """Recalcule un classement et remplace ses lignes ; retourne le nombre d'articles classés"""
+    now = now or timezone.now()
+    scores = compute_scores(feed, now)
+    best = sorted(scores.items(), key=lambda item: (-item[1], -item[0]))
+    best = best[:settings.RANKING_SIZE]
+
+    with transaction.atomic():
+        ArticleRanking.objects.filter(feed=feed).delete()
+        ArticleRanking.objects.bulk_create([
+            ArticleRanking(
+                feed=feed, position=position, article_id=article_id,
+                score=score, computed_at=now,
+            )
+            for position, (article_id, score) in enumerate(best, start=1)
+        ])
+    return len(best)
+
+
+def refresh_rankings():
+    """Recalcule tous les classements"""
+    return {feed: refresh_ranking(feed) for feed in FEEDS}
+
+
+def ranked_article_ids(feed, limit):
+    """Ids des articles d'un classement, dans l'ordre, en une lecture indexée"""
+    return list(
+        ArticleRanking.objects.filter(
+            feed=feed, article__status='published'
+        ).order_by('position').values_list('article_id', flat=True)[:limit]
+    )
@@ -0,0 +1,447 @@
+"""
+Index des articles similaires.
+
+La similarité combine le cosinus entre vecteurs TF-IDF (titre, extrait,
+contenu) et l'indice de Jaccard sur les tags. Les meilleurs voisins de chaque
+article publié sont stockés dans RelatedArticle pour être servis en une
+lecture indexée.
+
+La reconstruction complète (commande rebuild_related) enregistre aussi le
+vocabulaire, l'IDF et le vecteur de chaque article. Après la modification
+d'un article, seul son texte est vectorisé avec ce vocabulaire, puis comparé
+aux vecteurs enregistrés : le reste du corpus n'est ni relu ni retokenisé.
+
+Les modifications ne déclenchent pas ce calcul dans la requête : elles
+ajoutent une demande dans RelatedUpdate, traitée par le planificateur
+(commande publish_scheduled).
+"""
+import math
+import re
+from collections import Counter
+from itertools import islice
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Min, Q
+
+from .models import Article, ArticleVector, RelatedArticle, RelatedUpdate, SimilarityTerm
+
+TOKEN_RE = re.compile(r'[^\W\d_]{3,}')
+
+STOPWORDS = frozenset("""
+    les des une est pour dans par sur avec aux qui que quoi dont ses son sont
+    pas plus mais ont été être avoir fait faire cette ces cet comme tout tous
+    elle elles ils nous vous leur leurs lui aussi bien peu très sans sous entre
+    and the for with that this are was were from have has not but you your
+""".split())
+
+BATCH_SIZE = 500
+# Au-delà, une reconstruction complète des articles similaires est moins coûteuse
+RELATED_INCREMENTAL_LIMIT = 3
+# Longueur maximale d'un terme du vocabulaire enregistré (SimilarityTerm.term)
+TERM_MAX_LENGTH = 100
+
+
+def tokenize(text):
+    """Découpe un texte en mots normalisés, sans mots vides"""
+    return [word for word in TOKEN_RE.findall(text.lower()) if word not in STOPWORDS]
+
+
+def _article_text(title, excerpt, content):
+    # Le titre est répété pour peser davantage que le corps de l'article
+    return f'{title} {title} {excerpt} {content}'
+
+
+def build_vocabulary(term_counts, max_features):
+    """Retourne ({terme: colonne}, idf) pour les termes les plus fréquents du corpus"""
+    document_frequency = Counter()
+    for counts in term_counts:
+        document_frequency.update(counts.keys())
+    document_frequency = Counter({
+        term: count for term, count in document_frequency.items() if len(term) <= TERM_MAX_LENGTH
+    })
+
+    vocabulary = {
+        term: column
+        for column, (term, _) in enumerate(document_frequency.most_common(max_features))
+    }
+    n_documents = len(term_counts)
+    idf = np.zeros(len(vocabulary), dtype=np.float32)
+    for term, column in vocabulary.items():
+        idf[column] = math.log((1 + n_documents) / (1 + document_frequency[term])) + 1
+    return vocabulary, idf
+
+
+def tfidf_vector(counts, vocabulary, idf):
+    """Vecteur TF-IDF normalisé d'un document, à partir du compte de ses termes"""
+    vector = np.zeros(len(vocabulary), dtype=np.float32)
+    for term, count in counts.items():
+        column = vocabulary.get(term)
+        if column is not None:
+            vector[column] = 1 + math.log(count)
+    vector *= idf
+    norm = np.linalg.norm(vector)
+    if norm > 0:
+        vector /= norm
+    return vector
+
+
+def pack_vector(vector):
+    """Sérialise un vecteur creux : colonnes non nulles puis leurs poids"""
+    columns = np.flatnonzero(vector).astype('<u4')
+    return columns.tobytes() + vector[columns].astype('<f4').tobytes()
+
+
+class SimilarityIndex:
+    """Vecteurs TF-IDF et tags des articles publiés, en mémoire"""
+
+    def __init__(self, ids, matrix, article_tags, vocabulary, idf, tag_weight=None):
+        """
+        ids: ids des articles, dans l'ordre des lignes de matrix
+        article_tags: liste de (article_id, tag_id)
+        """
+        self.tag_weight = settings.RELATED_ARTICLES_TAG_WEIGHT if tag_weight is None else tag_weight
+        self.vocabulary = vocabulary
+        self.idf = idf
+
+        self.ids = list(ids)
+        self.positions = {pk: i for i, pk in enumerate(self.ids)}
+        self.matrix = matrix
+        self.tags = self._tag_matrix(article_tags)
+        self.tag_sizes = self.tags.sum(axis=1)
+
+    @classmethod
+    def from_documents(cls, documents, article_tags, max_features=None, tag_weight=None):
+        """
+        Construit l'index et son vocabulaire à partir des textes.
+
+        documents: liste de (id, texte)
+        """
+        max_features = max_features or settings.RELATED_ARTICLES_MAX_FEATURES
+        term_counts = [Counter(tokenize(text)) for _, text in documents]
+        vocabulary, idf = build_vocabulary(term_counts, max_features)
+        matrix = np.zeros((len(documents), len(vocabulary)), dtype=np.float32)
+        for row, counts in enumerate(term_counts):
+            matrix[row] = tfidf_vector(counts, vocabulary, idf)
+        return cls([pk for pk, _ in documents], matrix, article_tags, vocabulary, idf, tag_weight)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _tag_matrix(self, article_tags):
+        article_tags = [(a, t) for a, t in article_tags if a in self.positions]
+        tag_columns = {tag_id: i for i, tag_id in enumerate({t for _, t in article_tags})}
+        matrix = np.zeros((len(self.ids), len(tag_columns)), dtype=np.float32)
+        for article_id, tag_id in article_tags:
+            matrix[self.positions[article_id], tag_columns[tag_id]] = 1
+        return matrix
+
+    def scores(self, rows):
+        """Matrice des scores de similarité entre les lignes données et tout le corpus"""
+        text_scores = self.matrix[rows] @ self.matrix.T
+
+        shared_tags = self.tags[rows] @ self.tags.T
+        union = self.tag_sizes[rows, None] + self.tag_sizes[None, :] - shared_tags
+        tag_scores = np.divide(shared_tags, union, out=np.zeros_like(shared_tags), where=union > 0)
+
+        scores = (1 - self.tag_weight) * text_scores + self.tag_weight * tag_scores
+        # Un article n'est pas similaire à lui-même
+        scores[np.arange(len(rows)), rows] = 0
+        return scores
+
+    def neighbours(self, row_scores, limit, min_score):
+        """Retourne les (id, score) des meilleurs voisins, par score décroissant"""
+        return top_neighbours(self.ids, row_scores, limit, min_score)
+
+
+def top_neighbours(ids, row_scores, limit, min_score):
+    """Retourne les (id, score) des meilleurs voisins d'une ligne de scores"""
+    limit = min(limit, len(row_scores))
+    if limit <= 0:
+        return []
+    best = np.argpartition(-row_scores, limit - 1)[:limit]
+    best = best[np.argsort(-row_scores[best])]
+    return [(ids[i], float(row_scores[i])) for i in best if row_scores[i] >= min_score]
+
+
+def _published_tags(published):
+    return list(
+        Article.tags.through.objects.filter(article__in=published.values('pk'))
+        .values_list('article_id', 'tag_id')
+    )
+
+
+def load_index():
+    """Construit l'index à partir du texte des articles publiés"""
+    published = Article.objects.published().order_by('pk')
+    documents = [
+        (pk, _article_text(title, excerpt, content))
+        for pk, title, excerpt, content in published.values_list(
+            'pk', 'title', 'excerpt', 'content'
+        ).iterator()
+    ]
+    return SimilarityIndex.from_documents(documents, _published_tags(published))
+
+
+def save_index(index):
+    """Enregistre le vocabulaire et les vecteurs de l'index"""
+    SimilarityTerm.objects.all().delete()
+    ArticleVector.objects.all().delete()
+    SimilarityTerm.objects.bulk_create([
+        SimilarityTerm(term=term, column=column, idf=float(index.idf[column]))
+        for term, column in index.vocabulary.items()
+    ], batch_size=BATCH_SIZE)
+    ArticleVector.objects.bulk_create([
+        ArticleVector(article_id=pk, data=pack_vector(index.matrix[row]))
+        for row, pk in enumerate(index.ids)
+    ], batch_size=BATCH_SIZE)
+
+
+def load_vocabulary():
+    """Retourne le vocabulaire et l'IDF enregistrés, ou None avant la première reconstruction"""
+    terms = list(SimilarityTerm.objects.order_by('column').values_list('term', 'idf'))
+    if not terms:
+        return None
+    vocabulary = {term: column for column, (term, _) in enumerate(terms)}
+    idf = np.array([value for _, value in terms], dtype=np.float32)
+    return vocabulary, idf
+
+
+def _split_vector(data):
+    """Colonnes et poids d'un vecteur enregistré, sans le densifier"""
+    data = bytes(data)
+    half = len(data) // 2
+    return np.frombuffer(data[:half], dtype='<u4'), np.frombuffer(data[half:], dtype='<f4')
+
+
+def stored_scores(article_ids, vocabulary_size, chunk_size=BATCH_SIZE):
+    """
+    Scores de similarité entre quelques articles et tous les articles publiés.
+
+    Seuls les vecteurs des articles demandés sont densifiés ; les vecteurs
+    enregistrés du corpus sont lus par blocs et multipliés sous forme creuse.
+    Retourne (ids du corpus, lignes des articles demandés ayant un vecteur,
+    matrice des scores).
+    """
+    published = Article.objects.published()
+    queries = dict(
+        ArticleVector.objects.filter(article_id__in=article_ids, article__in=published.values('pk'))
+        .values_list('article_id', 'data')
+    )
+    query_ids = [pk for pk in article_ids if pk in queries]
+    query_matrix = np.zeros((len(query_ids), vocabulary_size + 1), dtype=np.float32)
+    for row, pk in enumerate(query_ids):
+        columns, weights = _split_vector(queries[pk])
+        query_matrix[row, columns] = weights
+
+    ids = []
+    blocks = []
+    vectors = (
+        ArticleVector.objects.filter(article__in=published.values('pk'))
+        .order_by('article_id').values_list('article_id', 'data')
+        .iterator(chunk_size=chunk_size)
+    )
+    while chunk := list(islice(vectors, chunk_size)):
+        parts = [_split_vector(data) for _, data in chunk]
+        ids.extend(pk for pk, _ in chunk)
+        lengths = np.array([len(columns) for columns, _ in parts])
+        # La colonne fictive vocabulary_size (toujours nulle) ferme le dernier segment
+        columns = np.concatenate([columns for columns, _ in parts] + [[vocabulary_size]])
+        weights = np.concatenate([weights for _, weights in parts] + [[0]])
+        products = query_matrix[:, columns] * weights
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        block = np.add.reduceat(products, starts, axis=1)
+        # reduceat renvoie l'élément de départ pour un segment vide
+        block[:, lengths == 0] = 0
+        blocks.append(block)
+    text_scores = np.hstack(blocks) if blocks else np.zeros((len(query_ids), 0), dtype=np.float32)
+
+    positions = {pk: i for i, pk in enumerate(ids)}
+    article_tags = [(a, t) for a, t in _published_tags(published) if a in positions]
+    tag_positions = np.array([positions[a] for a, _ in article_tags], dtype=np.int64)
+    tag_ids = np.array([t for _, t in article_tags], dtype=np.int64)
+    tag_sizes = np.bincount(tag_positions, minlength=len(ids)).astype(np.float32)
+
+    tag_weight = settings.RELATED_ARTICLES_TAG_WEIGHT
+    scores = (1 - tag_weight) * text_scores
+    for row, pk in enumerate(query_ids):
+        own_tags = tag_ids[tag_positions == positions[pk]]
+        shared = np.bincount(
+            tag_positions[np.isin(tag_ids, own_tags)], minlength=len(ids)
+        ).astype(np.float32)
+        union = len(own_tags) + tag_sizes - shared
+        scores[row] += tag_weight * np.divide(
+            shared, union, out=np.zeros_like(shared), where=union > 0
+        )
+        # Un article n'est pas similaire à lui-même
+        scores[row, positions[pk]] = 0
+    return ids, query_ids, scores
+
+
+def _neighbour_entries(index, rows, limit, min_score):
+    entries = []
+    for row, row_scores in zip(rows, index.scores(rows)):
+        article_id = index.ids[row]
+        entries.extend(
+            RelatedArticle(article_id=article_id, related_id=related_id, score=score)
+            for related_id, score in index.neighbours(row_scores, limit, min_score)
+        )
+    return entries
+
+
+def rebuild_related_index(chunk_size=256):
+    """Recalcule entièrement l'index des articles similaires et enregistre ses vecteurs"""
+    index = load_index()
+    limit = settings.RELATED_ARTICLES_COUNT
+    min_score = settings.RELATED_ARTICLES_MIN_SCORE
+
+    entries = []
+    for start in range(0, len(index), chunk_size):
+        rows = np.arange(start, min(start + chunk_size, len(index)))
+        entries.extend(_neighbour_entries(index, rows, limit, min_score))
+
+    with transaction.atomic():
+        RelatedArticle.objects.all().delete()
+        RelatedArticle.objects.bulk_create(entries, batch_size=BATCH_SIZE)
+        save_index(index)
+    return len(entries)
+
+
+def update_related_for_article(article_id):
+    """
+    Met à jour l'index après la modification d'un article.
+
+    Seul l'article modifié est vectorisé, avec le vocabulaire de la dernière
+    reconstruction. Ses voisins sont recalculés, il est inséré dans les
+    listes des autres articles où il entre dans les meilleurs résultats, et
+    les listes qui le contenaient sont recalculées entièrement pour ne pas
+    rester incomplètes s'il en sort.
+    """
+    stored = load_vocabulary()
+    if stored is None:
+        # Aucun vocabulaire enregistré : première construction complète
+        rebuild_related_index()
+        return
+    vocabulary, idf = stored
+    limit = settings.RELATED_ARTICLES_COUNT
+    min_score = settings.RELATED_ARTICLES_MIN_SCORE
+
+    with transaction.atomic():
+        article = (
+            Article.objects.published().filter(pk=article_id)
+            .values('title', 'excerpt', 'content').first()
+        )
+        if article is None:
+            ArticleVector.objects.filter(article_id=article_id).delete()
+        else:
+            counts = Counter(tokenize(_article_text(**article)))
+            ArticleVector.objects.update_or_create(
+                article_id=article_id,
+                defaults={'data': pack_vector(tfidf_vector(counts, vocabulary, idf))},
+            )
+
+        affected = set(
+            RelatedArticle.objects.filter(related_id=article_id).values_list('article_id', flat=True)
+        )
+        RelatedArticle.objects.filter(
+            Q(article_id=article_id) | Q(related_id=article_id) | Q(article_id__in=affected)
+        ).delete()
+
+        # Un seul passage sur les vecteurs enregistrés pour l'article et les listes touchées
+        ids, query_ids, scores = stored_scores([article_id, *sorted(affected)], len(vocabulary))
+        rows = dict(zip(query_ids, scores))
+
+        row_scores = rows.pop(article_id, None)
+        if row_scores is not None:
+            RelatedArticle.objects.bulk_create([
+                RelatedArticle(article_id=article_id, related_id=related_id, score=score)
+                for related_id, score in top_neighbours(ids, row_scores, limit, min_score)
+            ])
+
+            candidates = {
+                ids[i]: float(row_scores[i])
+                for i in np.flatnonzero(row_scores >= min_score)
+                if ids[i] not in affected
+            }
+            current = {
+                entry['article_id']: entry
+                for entry in RelatedArticle.objects.filter(article_id__in=candidates)
+                .values('article_id').annotate(count=Count('pk'), lowest=Min('score'))
+            }
+
+            additions = []
+            full_lists = []
+            for other_id, score in candidates.items():
+                entry = current.get(other_id)
+                if entry is None or entry['count'] < limit:
+                    additions.append(other_id)
+                elif score > entry['lowest']:
+                    additions.append(other_id)
+                    full_lists.append(other_id)
+
+            RelatedArticle.objects.bulk_create([
+                RelatedArticle(article_id=other_id, related_id=article_id, score=candidates[other_id])
+                for other_id in additions
+            ], batch_size=BATCH_SIZE)
+
+            # Les listes déjà pleines perdent leur voisin le moins similaire
+            for other_id in full_lists:
+                lowest = RelatedArticle.objects.filter(article_id=other_id).order_by('score', 'pk')[:1]
+                RelatedArticle.objects.filter(pk__in=list(lowest.values_list('pk', flat=True))).delete()
+
+        # Listes qui contenaient l'article : recalculées à partir des vecteurs enregistrés
+        RelatedArticle.objects.bulk_create([
+            RelatedArticle(article_id=other_id, related_id=related_id, score=score)
+            for other_id, other_scores in rows.items()
+            for related_id, score in top_neighbours(ids, other_scores, limit, min_score)
+        ], batch_size=BATCH_SIZE)
+
+
+def request_related_update(article_ids):
+    """
+    Demande le recalcul des voisins des articles, fait par process_related_updates.
+
+    La demande est écrite dans la transaction courante : elle disparaît avec
+    un rollback, et plusieurs demandes pour un même article (save puis
+    tags.set, par exemple) n'en font qu'une.
+    """
+    RelatedUpdate.objects.bulk_create(
+        [RelatedUpdate(article_id=pk) for pk in set(article_ids)], ignore_conflicts=True
+    )
+
+
+def claim_related_updates(batch_size):
+    """Retire de la file un lot de demandes ; SKIP LOCKED évite de les traiter deux fois"""
+    with transaction.atomic():
+        article_ids = list(
+            RelatedUpdate.objects.order_by('requested_at')
+            .select_for_update(skip_locked=True)
+            .values_list('article_id', flat=True)[:batch_size]
+        )
+        RelatedUpdate.objects.filter(article_id__in=article_ids).delete()
+    return article_ids
+
+
+def process_related_updates(batch_size=100):
+    """
+    Traite les demandes de recalcul en attente, par lots (voir la commande
+    publish_scheduled). Retourne le nombre d'articles traités.
+
+    Les demandes sont retirées de la file avant le calcul : une modification
+    faite pendant celui-ci crée une nouvelle demande, traitée au lot suivant.
+    En cas d'échec, les demandes du lot sont remises dans la file.
+    """
+    total = 0
+    while article_ids := claim_related_updates(batch_size):
+        try:
+            if len(article_ids) > RELATED_INCREMENTAL_LIMIT:
+                rebuild_related_index()
+            else:
+                for article_id in article_ids:
+                    update_related_for_article(article_id)
+        except Exception:
+            request_related_update(article_ids)
+            raise
+        total += len(article_ids)
+    return total
@@ -0,0 +1,43 @@
+"""
+Rendu JSON rapide avec orjson.
+
+orjson est optionnel : s'il n'est pas installé, le rendu standard de DRF est
+utilisé. La sortie est identique à celle de JSONRenderer en mode compact ;
+les données qu'orjson refuse (entiers de plus de 64 bits, par exemple) passent
+par le rendu standard. Seule différence : NaN et l'infini deviennent null,
+là où le mode strict de DRF lève une erreur.
+"""
+from rest_framework.utils import encoders
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Les dates passent par l'encodeur DRF pour garder son format exact, et les
+# clés non textuelles sont converties comme le fait json
+ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS if orjson else 0
+
+# Gère Decimal, les chaînes de traduction paresseuses, les dates, etc.
+_default = encoders.JSONEncoder().default
+
+
+class ORJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        renderer_context = renderer_context or {}
+        if (orjson is None or not self.compact or self.ensure_ascii
+                or self.get_indent(accepted_media_type, renderer_context) is not None):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=_default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Comme JSONRenderer, échapper U+2028 et U+2029 pour rester du JavaScript valide
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
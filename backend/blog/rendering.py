@@ -0,0 +1,78 @@
+"""Rendu Markdown des articles, effectué une seule fois à l'enregistrement"""
+import hashlib
+import re
+import threading
+
+import bleach
+import markdown
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
+
+EXCERPT_LENGTH = 300
+
+ALLOWED_TAGS = bleach.sanitizer.ALLOWED_TAGS | {
+    'p', 'br', 'hr', 'pre', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'img',
+    'table', 'thead', 'tbody', 'tr', 'th', 'td', 'dl', 'dt', 'dd', 'sup', 'sub',
+}
+HEADING_ATTRIBUTES = ['id']
+ALLOWED_ATTRIBUTES = {
+    **bleach.sanitizer.ALLOWED_ATTRIBUTES,
+    'a': ['href', 'title', 'rel'],
+    'img': ['src', 'alt', 'title'],
+    'code': ['class'],
+    'th': ['align'],
+    'td': ['align'],
+    **{f'h{level}': HEADING_ATTRIBUTES for level in range(1, 7)},
+}
+
+MARKDOWN_EXTENSIONS = ['extra', 'sane_lists', 'toc']
+
+WHITESPACE_RE = re.compile(r'\s+')
+
+# Markdown et Cleaner sont coûteux à construire mais pas thread-safe : un par thread
+_local = threading.local()
+
+
+def _renderers():
+    if not hasattr(_local, 'markdown'):
+        _local.markdown = markdown.Markdown(extensions=MARKDOWN_EXTENSIONS)
+        _local.cleaner = bleach.sanitizer.Cleaner(
+            tags=ALLOWED_TAGS, attributes=ALLOWED_ATTRIBUTES, strip=True
+        )
+    return _local.markdown, _local.cleaner
+
+
+def content_hash(content):
+    """Empreinte du contenu source, pour ne refaire le rendu que s'il change"""
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def _flatten_toc(tokens):
+    return [
+        {
+            'level': token['level'],
+            'id': token['id'],
+            'title': token['name'],
+            'children': _flatten_toc(token['children']),
+        }
+        for token in tokens
+    ]
+
+
+def render_content(content):
+    """
+    Convertit le Markdown en HTML assaini.
+
+    Returns:
+        tuple: (html, table des matières)
+    """
+    md, cleaner = _renderers()
+    html = md.reset().convert(content)
+    html = cleaner.clean(html)
+    return html, _flatten_toc(md.toc_tokens)
+
+
+def make_excerpt(html, length=EXCERPT_LENGTH):
+    """Génère un extrait en texte brut à partir du HTML rendu"""
+    text = WHITESPACE_RE.sub(' ', strip_tags(html)).strip()
+    return Truncator(text).chars(length)
@@ -0,0 +1,138 @@
+"""
+Historique des révisions d'articles.
+
+Chaque enregistrement qui modifie le titre, l'extrait ou le contenu crée une
+ArticleRevision. Le contenu est stocké compressé, soit en entier
+(instantané), soit sous forme de différences par lignes avec la révision
+précédente. Un instantané est écrit toutes les REVISION_SNAPSHOT_INTERVAL
+révisions, ou quand les différences ne sont pas plus petites que le texte :
+reconstruire une révision lit au plus un instantané et quelques deltas, en
+une requête.
+"""
+import hashlib
+import json
+import zlib
+from difflib import SequenceMatcher
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Subquery
+
+from .models import Article, ArticleRevision
+
+
+def _text_hash(title, excerpt, content):
+    return hashlib.sha256(
+        json.dumps([title, excerpt, content], ensure_ascii=False).encode('utf-8')
+    ).hexdigest()
+
+
+def _pack(payload):
+    return zlib.compress(json.dumps(payload, ensure_ascii=False).encode('utf-8'))
+
+
+def _unpack(data):
+    return json.loads(zlib.decompress(bytes(data)))
+
+
+def make_delta(old, new):
+    """
+    Différences par lignes de old vers new : [début, fin] recopie des lignes
+    de old, une chaîne est du texte nouveau.
+    """
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+    ops = []
+    matcher = SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            ops.append([i1, i2])
+        elif tag in ('replace', 'insert'):
+            ops.append(''.join(new_lines[j1:j2]))
+    return ops
+
+
+def apply_delta(old, ops):
+    old_lines = old.splitlines(keepends=True)
+    return ''.join(
+        ''.join(old_lines[op[0]:op[1]]) if isinstance(op, list) else op
+        for op in ops
+    )
+
+
+def get_revision(article_id, number=None):
+    """
+    Reconstruit une révision (la dernière si number est None).
+
+    Retourne {'number', 'title', 'excerpt', 'content', 'created_at'} ou None.
+    """
+    revisions = ArticleRevision.objects.filter(article_id=article_id)
+    if number is not None:
+        revisions = revisions.filter(number__lte=number)
+    # Dernier instantané avant la révision demandée, puis les deltas qui suivent
+    snapshot = revisions.filter(is_snapshot=True).order_by('-number').values('number')[:1]
+    chain = list(
+        revisions.filter(number__gte=Subquery(snapshot)).order_by('number')
+        .values('number', 'title', 'is_snapshot', 'data', 'created_at')
+    )
+    if not chain or (number is not None and chain[-1]['number'] != number):
+        return None
+
+    content = excerpt = None
+    for revision in chain:
+        payload = _unpack(revision['data'])
+        excerpt = payload['excerpt']
+        if revision['is_snapshot']:
+            content = payload['content']
+        else:
+            content = apply_delta(content, payload['delta'])
+
+    last = chain[-1]
+    return {
+        'number': last['number'],
+        'title': last['title'],
+        'excerpt': excerpt,
+        'content': content,
+        'created_at': last['created_at'],
+    }
+
+
+def record_revision(article):
+    """
+    Enregistre une révision si le texte de l'article a changé ; la retourne.
+
+    La ligne de l'article est verrouillée le temps de calculer et d'écrire le
+    numéro : deux enregistrements concurrents prennent des numéros successifs
+    au lieu de se heurter à la contrainte unique (article, number).
+    """
+    with transaction.atomic():
+        list(Article.objects.select_for_update().filter(pk=article.pk).values_list('pk', flat=True))
+        return _record_revision(article)
+
+
+def _record_revision(article):
+    text_hash = _text_hash(article.title, article.excerpt, article.content)
+    last = (
+        ArticleRevision.objects.filter(article=article)
+        .order_by('-number').values('number', 'text_hash').first()
+    )
+    if last is not None and last['text_hash'] == text_hash:
+        return None
+
+    number = 1 if last is None else last['number'] + 1
+    snapshot = _pack({'excerpt': article.excerpt, 'content': article.content})
+    data, is_snapshot = snapshot, True
+    if last is not None and (number - 1) % settings.REVISION_SNAPSHOT_INTERVAL:
+        previous = get_revision(article.pk)
+        delta = _pack({
+            'excerpt': article.excerpt,
+            'delta': make_delta(previous['content'], article.content),
+        })
+        # Un delta plus gros que le texte complet ne fait rien gagner
+        if len(delta) < len(snapshot):
+            data, is_snapshot = delta, False
+
+    return ArticleRevision.objects.create(
+        article=article, number=number, title=article.title,
+        is_snapshot=is_snapshot, data=data, text_hash=text_hash,
+    )
@@ -0,0 +1,62 @@
+"""Publication des articles programmés (voir la commande publish_scheduled)"""
+import logging
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Article
+from .related import request_related_update
+from .syndication import invalidate_published
+from .taxonomy import refresh_category_counts, refresh_tag_counts
+
+logger = logging.getLogger(__name__)
+
+
+def publish_due_batch(batch_size=100):
+    """
+    Publie un lot d'articles programmés arrivés à échéance.
+
+    Les lignes sont verrouillées avec SKIP LOCKED pour que plusieurs
+    scanners puissent tourner sans publier deux fois le même article.
+    Retourne les ids publiés.
+    """
+    with transaction.atomic():
+        due = (
+            Article.objects.due()
+            .order_by('published_at')
+            .select_for_update(skip_locked=True)
+            .values_list('pk', 'category_id')[:batch_size]
+        )
+        rows = list(due)
+        if not rows:
+            return []
+
+        article_ids = [pk for pk, _ in rows]
+        Article.objects.filter(pk__in=article_ids).update(
+            status='published', updated_at=timezone.now()
+        )
+
+        # update() ne déclenche pas les signaux : mise à jour explicite des données dérivées
+        category_ids = [category_id for _, category_id in rows]
+        tag_ids = list(
+            Article.tags.through.objects.filter(article_id__in=article_ids)
+            .values_list('tag_id', flat=True).distinct()
+        )
+        refresh_category_counts(category_ids)
+        refresh_tag_counts(tag_ids)
+        request_related_update(article_ids)
+
+    invalidate_published(article_ids, category_ids, tag_ids)
+
+    return article_ids
+
+
+def publish_due_articles(batch_size=100):
+    """Publie tous les articles programmés arrivés à échéance, par lots"""
+    total = 0
+    while True:
+        published = publish_due_batch(batch_size)
+        if not published:
+            return total
+        total += len(published)
+        logger.info('%d article(s) programmé(s) publié(s)', len(published))
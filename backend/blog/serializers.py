@@ -3,32 +3,49 @@ from .models import Article, Category, Tag, Comment
 from django.contrib.auth.models import User
 
 
+class SparseFieldsMixin:
+    """Ne garde que les champs passés dans l'argument `fields` (ex. ?fields=id,title)"""
+    
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        
+        if fields:
+            kept = set(fields) & set(self.fields)
+            # Aucun champ connu demandé : on renvoie la représentation complète
+            if kept:
+                for name in set(self.fields) - kept:
+                    self.fields.pop(name)
+
+
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ['id', 'username', 'first_name', 'last_name', 'email']
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Category
-        fields = ['id', 'name', 'slug', 'description', 'created_at']
+        fields = ['id', 'name', 'slug', 'description', 'created_at', 'article_count']
+        read_only_fields = ['article_count']
 
 
-class TagSerializer(serializers.ModelSerializer):
+class TagSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Tag
-        fields = ['id', 'name', 'slug']
+        fields = ['id', 'name', 'slug', 'article_count']
+        read_only_fields = ['article_count']
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Comment
         fields = ['id', 'author_name', 'author_email', 'content', 'created_at', 'is_approved']
         read_only_fields = ['created_at', 'is_approved']
 
 
-class ArticleListSerializer(serializers.ModelSerializer):
+class ArticleListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     author = UserSerializer(read_only=True)
     category = CategorySerializer(read_only=True)
     tags = TagSerializer(many=True, read_only=True)
@@ -42,7 +59,7 @@ class ArticleListSerializer(serializers.ModelSerializer):
         ]
 
 
-class ArticleDetailSerializer(serializers.ModelSerializer):
+class ArticleDetailSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     author = UserSerializer(read_only=True)
     category = CategorySerializer(read_only=True)
     tags = TagSerializer(many=True, read_only=True)
@@ -51,10 +68,10 @@ class ArticleDetailSerializer(serializers.ModelSerializer):
     class Meta:
         model = Article
         fields = [
-            'id', 'title', 'slug', 'content', 'excerpt', 'status',
+            'id', 'title', 'slug', 'content', 'content_html', 'content_toc', 'excerpt', 'status',
             'created_at', 'updated_at', 'published_at', 'author', 'category',
             'tags', 'featured_image', 'meta_description', 'ai_checked',
-            'ai_score', 'ai_feedback', 'reading_time', 'comments'
+            'ai_score', 'ai_feedback', 'reading_time', 'view_count', 'comments'
         ]
 
 
@@ -63,16 +80,26 @@ class ArticleCreateUpdateSerializer(serializers.ModelSerializer):
         model = Article
         fields = [
             'title', 'content', 'excerpt', 'status', 'category', 'tags',
-            'featured_image', 'meta_description'
+            'featured_image', 'meta_description', 'published_at'
         ]
     
+    def validate(self, attrs):
+        status = attrs.get('status', getattr(self.instance, 'status', 'draft'))
+        published_at = attrs.get('published_at', getattr(self.instance, 'published_at', None))
+        if status == 'scheduled' and not published_at:
+            raise serializers.ValidationError({
+                'published_at': 'Une date de publication est requise pour programmer un article'
+            })
+        return attrs
+    
     def create(self, validated_data):
         validated_data['author'] = self.context['request'].user
         return super().create(validated_data)
     
     def update(self, instance, validated_data):
-        # Si l'article passe en statut publié, mettre à jour la date de publication
-        if validated_data.get('status') == 'published' and instance.status != 'published':
+        # Si l'article passe en statut publié sans date fournie, le publier maintenant
+        if (validated_data.get('status') == 'published' and instance.status != 'published'
+                and 'published_at' not in validated_data):
             from django.utils import timezone
             validated_data['published_at'] = timezone.now()
         
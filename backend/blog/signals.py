@@ -0,0 +1,176 @@
+from functools import partial
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import DEFERRED
+from django.db.models.signals import (
+    m2m_changed, post_delete, post_init, post_save, pre_delete, pre_save
+)
+from django.dispatch import receiver
+
+from .authentication import user_cache
+from .models import Article, Category, Tag
+from .related import request_related_update
+from .revisions import record_revision
+from .syndication import invalidate, invalidate_published
+from .taxonomy import refresh_category_counts, refresh_tag_counts
+
+# Champs dont la modification invalide les articles similaires
+RELATED_SOURCE_FIELDS = ('title', 'excerpt', 'content', 'status')
+
+# Champs conservés dans l'historique des révisions
+REVISION_FIELDS = {'title', 'excerpt', 'content'}
+
+
+def schedule_related_update(article_id):
+    """Demande le recalcul des articles similaires au planificateur"""
+    request_related_update([article_id])
+
+
+def schedule_syndication_invalidation(article_ids=(), category_ids=(), tag_ids=()):
+    """Invalide les flux et sitemaps concernés après le commit"""
+    transaction.on_commit(partial(
+        invalidate_published, list(article_ids), list(category_ids), list(tag_ids)
+    ))
+
+
+@receiver(post_init, sender=Article)
+def remember_article_state(sender, instance, **kwargs):
+    """Mémorise l'état chargé de l'article pour détecter les changements au save"""
+    # Lecture via __dict__ : accéder à un champ différé (only(), defer(),
+    # refresh_from_db) le chargerait et relancerait post_init sans fin
+    instance._original_status = instance.__dict__.get('status', DEFERRED)
+    instance._original_category_id = instance.__dict__.get('category_id', DEFERRED)
+
+
+@receiver(pre_save, sender=Article)
+def load_deferred_article_state(sender, instance, **kwargs):
+    """Relit en base l'état d'origine des champs qui n'avaient pas été chargés"""
+    if DEFERRED not in (instance._original_status, instance._original_category_id):
+        return
+    original = (
+        Article.objects.filter(pk=instance.pk).values('status', 'category_id').first()
+        if instance.pk is not None else None
+    ) or {'status': None, 'category_id': None}
+    if instance._original_status is DEFERRED:
+        instance._original_status = original['status']
+    if instance._original_category_id is DEFERRED:
+        instance._original_category_id = original['category_id']
+
+
+@receiver(pre_save, sender=Article)
+def detect_related_source_change(sender, instance, **kwargs):
+    """Détermine si le texte ou le statut de l'article ont changé"""
+    if instance.pk is None:
+        instance._related_source_changed = instance.status == 'published'
+        return
+    if instance.status != 'published' and instance._original_status != 'published':
+        # Un brouillon n'apparaît pas dans l'index, ni avant ni après
+        instance._related_source_changed = False
+        return
+    previous = Article.objects.filter(pk=instance.pk).values(*RELATED_SOURCE_FIELDS).first()
+    instance._related_source_changed = previous is None or any(
+        previous[field] != getattr(instance, field) for field in RELATED_SOURCE_FIELDS
+    )
+
+
+@receiver(post_save, sender=Article)
+def update_related_on_save(sender, instance, **kwargs):
+    """Recalcule les articles similaires quand le texte ou le statut changent"""
+    if getattr(instance, '_related_source_changed', True):
+        schedule_related_update(instance.pk)
+
+
+@receiver(post_save, sender=Article)
+def record_revision_on_save(sender, instance, update_fields=None, **kwargs):
+    """Ajoute une révision à l'historique quand le texte change"""
+    if update_fields is None or REVISION_FIELDS & set(update_fields):
+        record_revision(instance)
+
+
+@receiver(post_save, sender=Article)
+def invalidate_syndication_on_save(sender, instance, **kwargs):
+    """Les brouillons n'apparaissent ni dans les flux ni dans les sitemaps"""
+    if instance.status == 'published' or instance._original_status == 'published':
+        schedule_syndication_invalidation(
+            [instance.pk],
+            [instance.category_id, instance._original_category_id],
+            instance.tags.values_list('pk', flat=True),
+        )
+
+
+@receiver(post_save, sender=Article)
+def update_taxonomy_counts_on_save(sender, instance, created, **kwargs):
+    """Met à jour les compteurs quand le statut ou la catégorie changent"""
+    status_changed = created or instance.status != instance._original_status
+    category_changed = instance.category_id != instance._original_category_id
+
+    if status_changed or category_changed:
+        refresh_category_counts([instance.category_id, instance._original_category_id])
+    if status_changed and not created:
+        refresh_tag_counts(instance.tags.values_list('pk', flat=True))
+
+    instance._original_status = instance.status
+    instance._original_category_id = instance.category_id
+
+
+@receiver(m2m_changed, sender=Article.tags.through)
+def update_tag_counts_on_tags_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """Met à jour les compteurs des tags ajoutés ou retirés d'un article"""
+    if reverse:
+        # tag.article_set.add(...) : seul le tag courant est concerné
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            refresh_tag_counts([instance.pk])
+            for article_id in pk_set or []:
+                schedule_related_update(article_id)
+            schedule_syndication_invalidation(pk_set or [], tag_ids=[instance.pk])
+        return
+
+    # Les tags d'un brouillon n'entrent pas dans les compteurs
+    if instance.status != 'published':
+        return
+
+    if action == 'pre_clear':
+        instance._cleared_tag_ids = list(instance.tags.values_list('pk', flat=True))
+    elif action == 'post_clear':
+        refresh_tag_counts(getattr(instance, '_cleared_tag_ids', []))
+        schedule_related_update(instance.pk)
+        schedule_syndication_invalidation(
+            [instance.pk], tag_ids=getattr(instance, '_cleared_tag_ids', [])
+        )
+    elif action in ('post_add', 'post_remove'):
+        refresh_tag_counts(pk_set or [])
+        schedule_related_update(instance.pk)
+        schedule_syndication_invalidation([instance.pk], tag_ids=pk_set or [])
+
+
+@receiver(pre_delete, sender=Article)
+def remember_tags_before_delete(sender, instance, **kwargs):
+    """Les liaisons de tags sont supprimées avant post_delete, on les garde ici"""
+    instance._deleted_tag_ids = list(instance.tags.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Article)
+def update_taxonomy_counts_on_delete(sender, instance, **kwargs):
+    """Met à jour les compteurs après la suppression d'un article"""
+    refresh_category_counts([instance.category_id])
+    refresh_tag_counts(getattr(instance, '_deleted_tag_ids', []))
+    if instance.status == 'published':
+        schedule_syndication_invalidation(
+            [instance.pk], [instance.category_id], getattr(instance, '_deleted_tag_ids', [])
+        )
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Tag)
+def invalidate_taxonomy_feed(sender, instance, **kwargs):
+    """Le titre et la description du flux viennent de la catégorie ou du tag"""
+    kind = 'category' if sender is Category else 'tag'
+    invalidate([f'feed:{kind}:{instance.slug}'])
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    """Retire l'utilisateur modifié du cache d'authentification"""
+    user_cache.invalidate(instance.pk)
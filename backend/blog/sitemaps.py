@@ -0,0 +1,105 @@
+"""
+Sitemaps segmentés des articles publiés.
+
+/sitemap.xml est un index listant les pages fixes et un sitemap par tranche
+de SITEMAP_SEGMENT_SIZE ids d'articles. Un segment est écrit en flux depuis
+un itérateur de base de données, sans charger tous les articles en mémoire,
+et mis en cache à la fin du flux ; seul le segment d'un article modifié est
+régénéré (voir blog.syndication).
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, IntegerField, Max, Value
+from django.db.models.functions import Floor
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.html import escape
+
+from .models import Article
+from .syndication import CACHE_TIMEOUT, cache_key
+
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n'
+XMLNS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+
+# Pages du frontend hors articles
+STATIC_PAGES = ['/', '/articles']
+
+
+def _url(location, lastmod=None):
+    lastmod = f'<lastmod>{lastmod.date().isoformat()}</lastmod>' if lastmod else ''
+    return f'<url><loc>{escape(location)}</loc>{lastmod}</url>\n'
+
+
+def _sitemap(location, lastmod=None):
+    lastmod = f'<lastmod>{lastmod.date().isoformat()}</lastmod>' if lastmod else ''
+    return f'<sitemap><loc>{escape(location)}</loc>{lastmod}</sitemap>\n'
+
+
+def _caching_stream(key, chunks):
+    """Transmet les morceaux et met le document en cache une fois le flux terminé"""
+    parts = []
+    for chunk in chunks:
+        parts.append(chunk)
+        yield chunk
+    cache.set(key, ''.join(parts), CACHE_TIMEOUT)
+
+
+def _segments():
+    """Retourne [(segment, dernière modification)] des segments non vides"""
+    size = settings.SITEMAP_SEGMENT_SIZE
+    return list(
+        Article.objects.published()
+        .annotate(segment=Floor(F('pk') / Value(size), output_field=IntegerField()))
+        .values('segment').annotate(lastmod=Max('updated_at'))
+        .order_by('segment').values_list('segment', 'lastmod')
+    )
+
+
+def sitemap_index(request):
+    key = cache_key('sitemap:index', request.get_host())
+    content = cache.get(key)
+    if content is None:
+        entries = [_sitemap(request.build_absolute_uri(reverse('sitemap-pages')))]
+        entries += [
+            _sitemap(
+                request.build_absolute_uri(reverse('sitemap-articles', args=[int(segment)])),
+                lastmod,
+            )
+            for segment, lastmod in _segments()
+        ]
+        content = ''.join([
+            XML_HEADER, f'<sitemapindex xmlns="{XMLNS}">\n', *entries, '</sitemapindex>\n',
+        ])
+        cache.set(key, content, CACHE_TIMEOUT)
+    return HttpResponse(content, content_type='application/xml')
+
+
+def pages_sitemap(request):
+    urls = ''.join(_url(f'{settings.SITE_URL}{path}') for path in STATIC_PAGES)
+    return HttpResponse(
+        f'{XML_HEADER}<urlset xmlns="{XMLNS}">\n{urls}</urlset>\n',
+        content_type='application/xml',
+    )
+
+
+def articles_sitemap(request, segment):
+    key = cache_key(f'sitemap:articles:{segment}')
+    content = cache.get(key)
+    if content is not None:
+        return HttpResponse(content, content_type='application/xml')
+
+    size = settings.SITEMAP_SEGMENT_SIZE
+    articles = Article.objects.published().filter(
+        pk__gte=segment * size, pk__lt=(segment + 1) * size
+    ).order_by('pk').values_list('slug', 'updated_at')
+    if not articles.exists():
+        raise Http404
+
+    def chunks():
+        yield XML_HEADER
+        yield f'<urlset xmlns="{XMLNS}">\n'
+        for slug, updated_at in articles.iterator(chunk_size=1000):
+            yield _url(f'{settings.SITE_URL}/articles/{slug}', updated_at)
+        yield '</urlset>\n'
+
+    return StreamingHttpResponse(_caching_stream(key, chunks()), content_type='application/xml')
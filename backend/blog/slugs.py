@@ -0,0 +1,146 @@
+import re
+
+from django.db import IntegrityError, transaction
+from django.db.models import (
+    BigIntegerField, Case, CharField, Exists, F, Max, Min, OuterRef, Q, Value, When,
+)
+from django.db.models.functions import Cast, Concat, Substr
+from django.db.models.lookups import Exact
+from django.utils.text import slugify
+
+# Place laissée en fin de slug pour un suffixe "-N"
+SUFFIX_RESERVE = 6
+
+
+def _slug_base(model, value, slug_field, reserve):
+    """Calcule le slug de base, tronqué pour laisser la place au suffixe"""
+    max_length = model._meta.get_field(slug_field).max_length
+    base = slugify(value) or model._meta.model_name
+    return base[:max_length - reserve].strip('-') or model._meta.model_name
+
+
+def _suffix_expression(slug, base):
+    """Suffixe numérique d'un slug "base" ou "base-N" ; le slug nu vaut 1"""
+    return Case(
+        When(Exact(slug, Value(base)), then=Value(1)),
+        default=Cast(Substr(slug, len(base) + 2), BigIntegerField()),
+        output_field=BigIntegerField(),
+    )
+
+
+def _suffix_usage(model, base, slug_field, exclude_pk=None):
+    """
+    Retourne (premier suffixe libre, plus grand suffixe utilisé) pour un slug
+    de base ; le plus grand vaut None si aucun slug n'est pris.
+
+    Un slug issu d'un titre finissant par un nombre ("hello-world-2024") est
+    indiscernable d'un suffixe généré : le premier suffixe libre est donc le
+    plus petit trou à partir de 1, et non le maximum + 1, pour que
+    "Hello World" donne "hello-world-2" et pas "hello-world-2025".
+
+    Le préfixe `startswith` permet un parcours de plage sur l'index unique,
+    la regex ne garde que "base" et "base-N" ; tout est calculé par la base
+    en une seule requête qui renvoie une seule ligne.
+    """
+    queryset = model._default_manager.filter(**{
+        f'{slug_field}__startswith': base,
+        f'{slug_field}__regex': rf'^{re.escape(base)}(-[0-9]+)?$',
+    })
+    if exclude_pk is not None:
+        queryset = queryset.exclude(pk=exclude_pk)
+
+    suffix = _suffix_expression(F(slug_field), base)
+    # Le suffixe suivant un suffixe pris est libre s'il n'existe aucun slug
+    # "base-(N+1)"
+    following = Concat(
+        Value(f'{base}-'),
+        Cast(_suffix_expression(OuterRef(slug_field), base) + 1, CharField()),
+        output_field=CharField(),
+    )
+    following_taken = model._default_manager.filter(**{slug_field: following})
+    if exclude_pk is not None:
+        following_taken = following_taken.exclude(pk=exclude_pk)
+    usage = queryset.aggregate(
+        bare=Max(Case(When(**{slug_field: base}, then=Value(1)), default=Value(0))),
+        first_free=Min(suffix + 1, filter=~Q(Exists(following_taken))),
+        highest=Max(suffix),
+    )
+    if not usage['bare']:
+        return 1, usage['highest']
+    return usage['first_free'], usage['highest']
+
+
+def _format_slug(base, suffix):
+    return base if suffix == 1 else f'{base}-{suffix}'
+
+
+def unique_slugify(instance, value, slug_field='slug'):
+    """
+    Génère un slug unique pour une instance.
+
+    Les collisions sont résolues en prenant le premier suffixe -N libre,
+    à partir d'une seule requête par préfixe.
+    """
+    return allocate_slugs(
+        type(instance), [value], slug_field=slug_field, exclude_pk=instance.pk
+    )[0]
+
+
+def allocate_slugs(model, values, slug_field='slug', exclude_pk=None):
+    """
+    Alloue des slugs uniques pour une liste de valeurs (ex. avant un bulk_create).
+
+    Une requête est faite par slug de base distinct, et les collisions à
+    l'intérieur du lot sont aussi résolues.
+    """
+    bases = [_slug_base(model, value, slug_field, SUFFIX_RESERVE) for value in values]
+
+    # Le premier slug d'une base prend le premier trou, les suivants du lot
+    # passent après le plus grand suffixe pris : on ne connaît qu'un trou
+    next_suffix = {}
+    for base in set(bases):
+        first_free, highest = _suffix_usage(model, base, slug_field, exclude_pk)
+        next_suffix[base] = (first_free, max(first_free, highest or 0) + 1)
+
+    slugs = []
+    for base in bases:
+        suffix, after = next_suffix[base]
+        next_suffix[base] = (after, after + 1)
+        slugs.append(_format_slug(base, suffix))
+    return slugs
+
+
+def assign_unique_slugs(instances, slug_field='slug'):
+    """Renseigne le slug des instances qui n'en ont pas, avant un bulk_create"""
+    instances = [obj for obj in instances if not getattr(obj, slug_field)]
+    if not instances:
+        return
+    model = type(instances[0])
+    values = [getattr(obj, model.slug_source) for obj in instances]
+    for obj, slug in zip(instances, allocate_slugs(model, values, slug_field)):
+        setattr(obj, slug_field, slug)
+
+
+class UniqueSlugMixin:
+    """
+    Remplit automatiquement le slug à partir de `slug_source` lors du save.
+
+    Si une sauvegarde concurrente prend le même slug entre l'allocation et
+    l'insertion, un nouveau slug est alloué et l'insertion retentée.
+    """
+    slug_source = 'name'
+    slug_max_attempts = 3
+
+    def save(self, *args, **kwargs):
+        if self.slug:
+            return super().save(*args, **kwargs)
+
+        for attempt in range(self.slug_max_attempts):
+            self.slug = unique_slugify(self, getattr(self, self.slug_source))
+            try:
+                with transaction.atomic():
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                self.slug = ''
+                if attempt == self.slug_max_attempts - 1:
+                    raise
@@ -0,0 +1,322 @@
+"""
+Export statique des articles publiés (voir la commande export_static).
+
+Arborescence produite dans le dossier de sortie :
+    api/articles/index/<n>.json               pages de la liste, au format
+                                              paginé de l'API (count, next,
+                                              previous, results)
+    api/categories/<slug>/index/<n>.json      pages des articles d'une catégorie
+    api/tags/<slug>/index/<n>.json            pages des articles d'un tag
+    api/articles/<slug>.json                  détail, au format de ArticleDetailSerializer
+    index.html, page/<n>/index.html           pages HTML de la liste
+    categories/<slug>/..., tags/<slug>/...    pages HTML par catégorie et par tag
+    articles/<slug>/index.html                page HTML de l'article
+    manifest.json                             état du dernier export
+
+L'export est incrémental : seuls les articles modifiés (updated_at) ou ayant
+reçu un commentaire approuvé depuis le dernier export sont régénérés, et les
+fichiers des articles dépubliés sont supprimés. Une page de liste n'est
+réécrite que si ses articles, le total de sa liste ou l'un de ses articles
+ont changé ; les listes des catégories et tags qui n'ont plus d'article
+publié sont supprimées. Les détails sont répartis par lots entre plusieurs
+processus.
+"""
+import json
+import multiprocessing
+import os
+import shutil
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Prefetch, Q
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .fast_serializers import serialize_article_list
+from .models import Article, Category, Comment, Tag
+from .renderers import ORJSONRenderer
+from .serializers import ArticleDetailSerializer
+
+MANIFEST_NAME = 'manifest.json'
+CHUNK_SIZE = 50
+# Pages de liste sérialisées ensemble (deux requêtes par groupe)
+LISTING_CHUNK_PAGES = 50
+# Même ordre que la liste de l'API, avec l'id pour départager les égalités
+LISTING_ORDERING = ['-published_at', '-created_at', '-pk']
+
+_renderer = ORJSONRenderer()
+
+
+def _write(path, content):
+    """Écrit le fichier de façon atomique : jamais de fichier à moitié écrit"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def _detail_path(output, slug):
+    return os.path.join(output, 'api', 'articles', f'{slug}.json')
+
+
+def _html_dir(output, slug):
+    return os.path.join(output, 'articles', slug)
+
+
+def load_manifest(output):
+    try:
+        with open(os.path.join(output, MANIFEST_NAME), encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {'exported_at': None, 'articles': {}, 'listings': {}}
+
+
+def export_articles(article_ids, output):
+    """Écrit le JSON de détail et la page HTML des articles ; retourne {id: slug}"""
+    articles = (
+        Article.objects.filter(pk__in=article_ids)
+        .select_related('author', 'category')
+        # Les commentaires non approuvés ne sont pas publiés
+        .prefetch_related('tags', Prefetch('comments', Comment.objects.filter(is_approved=True)))
+    )
+    articles = list(articles)
+    # Un seul sérialiseur pour le lot : les champs ne sont construits qu'une fois
+    details = ArticleDetailSerializer(articles, many=True).data
+    exported = {}
+    for article, data in zip(articles, details):
+        _write(_detail_path(output, article.slug), _renderer.render(data))
+        _write(
+            os.path.join(_html_dir(output, article.slug), 'index.html'),
+            render_to_string('blog/static_article.html', {'article': article}),
+        )
+        exported[str(article.pk)] = article.slug
+    return exported
+
+
+def _init_worker():
+    # Chaque processus ouvre ses propres connexions à la base
+    connections.close_all()
+
+
+def changed_article_ids(since):
+    """Articles publiés à régénérer depuis la date du dernier export (tous si None)"""
+    published = Article.objects.published()
+    if since is not None:
+        published = published.filter(
+            Q(updated_at__gt=since)
+            | Q(published_at__gt=since)
+            | Q(comments__is_approved=True, comments__created_at__gt=since)
+        ).distinct()
+    return list(published.order_by('pk').values_list('pk', flat=True))
+
+
+def listing_scopes():
+    """
+    Retourne les listes à exporter : {portée: {'title', 'api', 'html', 'ids'}},
+    ids étant les articles publiés de la liste dans l'ordre de l'API.
+    """
+    rows = list(
+        Article.objects.published().order_by(*LISTING_ORDERING).values_list('pk', 'category_id')
+    )
+    position = {pk: i for i, (pk, _) in enumerate(rows)}
+    scopes = {
+        'all': {'title': 'Articles', 'api': 'api/articles', 'html': '', 'ids': list(position)},
+    }
+
+    by_category = defaultdict(list)
+    for pk, category_id in rows:
+        if category_id is not None:
+            by_category[category_id].append(pk)
+    for pk, slug, name in Category.objects.filter(pk__in=by_category).values_list('pk', 'slug', 'name'):
+        scopes[f'category:{slug}'] = {
+            'title': name, 'api': f'api/categories/{slug}', 'html': f'categories/{slug}',
+            'ids': by_category[pk],
+        }
+
+    by_tag = defaultdict(list)
+    for article_id, tag_id in Article.tags.through.objects.filter(
+        article__in=Article.objects.published().values('pk')
+    ).values_list('article_id', 'tag_id'):
+        by_tag[tag_id].append(article_id)
+    for pk, slug, name in Tag.objects.filter(pk__in=by_tag).values_list('pk', 'slug', 'name'):
+        scopes[f'tag:{slug}'] = {
+            'title': f'#{name}', 'api': f'api/tags/{slug}', 'html': f'tags/{slug}',
+            'ids': sorted(by_tag[pk], key=position.__getitem__),
+        }
+    return scopes
+
+
+def _page_json_path(output, listing, number):
+    return os.path.join(output, listing['api'], 'index', f'{number}.json')
+
+
+def _page_html_dir(output, listing, number):
+    parts = [listing['html']] if number == 1 else [listing['html'], 'page', str(number)]
+    return os.path.join(output, *filter(None, parts))
+
+
+def _page_url(base_url, listing, number, html=False):
+    if not html:
+        return f"{base_url}/{listing['api']}/index/{number}.json"
+    parts = [listing['html']] if number == 1 else [listing['html'], 'page', str(number)]
+    path = '/'.join(filter(None, parts))
+    return f'{base_url}/{path}/' if path else f'{base_url}/'
+
+
+def _write_listing_page(output, listing, number, page_count, results, base_url):
+    """Écrit une page de liste en JSON (format paginé de l'API) et en HTML"""
+    def link(n, html=False):
+        return _page_url(base_url, listing, n, html) if 1 <= n <= page_count else None
+
+    _write(_page_json_path(output, listing, number), _renderer.render({
+        'count': listing['count'],
+        'next': link(number + 1),
+        'previous': link(number - 1),
+        'results': results,
+    }))
+    articles = [
+        {**item, 'published_at': item['published_at'] and parse_datetime(item['published_at'])}
+        for item in results
+    ]
+    _write(os.path.join(_page_html_dir(output, listing, number), 'index.html'), render_to_string(
+        'blog/static_index.html', {
+            'title': listing['title'],
+            'articles': articles,
+            'number': number,
+            'page_count': page_count,
+            'next_url': link(number + 1, html=True),
+            'previous_url': link(number - 1, html=True),
+            'base_url': base_url,
+        },
+    ))
+
+
+def _remove_listing_page(output, listing, number):
+    path = _page_json_path(output, listing, number)
+    if os.path.exists(path):
+        os.remove(path)
+    if number > 1:
+        shutil.rmtree(_page_html_dir(output, listing, number), ignore_errors=True)
+
+
+def export_listings(output, previous, changed_ids, base_url=''):
+    """
+    Écrit les pages de liste qui ont changé depuis l'export précédent.
+
+    previous est l'état des listes du manifeste précédent ; retourne
+    (nouvel état, nombre de pages écrites).
+    """
+    page_size = settings.REST_FRAMEWORK['PAGE_SIZE']
+    changed_ids = set(changed_ids)
+    listings = {}
+    written = 0
+    for scope, scope_info in listing_scopes().items():
+        ids = scope_info.pop('ids')
+        listing = {**scope_info, 'count': len(ids)}
+        pages = [ids[i:i + page_size] for i in range(0, len(ids), page_size)] or [[]]
+        old = previous.get(scope, {})
+        old_pages = old.get('pages', [])
+        # Le total et le titre figurent sur chaque page
+        same_header = old.get('count') == len(ids) and old.get('title') == listing['title']
+        stale = [
+            number for number, page_ids in enumerate(pages, 1)
+            if not same_header
+            or number > len(old_pages)
+            or old_pages[number - 1] != page_ids
+            or not changed_ids.isdisjoint(page_ids)
+        ]
+
+        for start in range(0, len(stale), LISTING_CHUNK_PAGES):
+            group = stale[start:start + LISTING_CHUNK_PAGES]
+            items = {
+                item['id']: item
+                for item in serialize_article_list(pk for n in group for pk in pages[n - 1])
+            }
+            for number in group:
+                results = [items[pk] for pk in pages[number - 1] if pk in items]
+                _write_listing_page(output, listing, number, len(pages), results, base_url)
+        written += len(stale)
+
+        for number in range(len(pages) + 1, len(old_pages) + 1):
+            _remove_listing_page(output, old, number)
+        listings[scope] = {**listing, 'pages': pages}
+
+    # Catégories et tags sans article publié, supprimés ou renommés
+    for scope, old in previous.items():
+        if scope not in listings:
+            shutil.rmtree(os.path.join(output, old['api']), ignore_errors=True)
+            shutil.rmtree(os.path.join(output, old['html']), ignore_errors=True)
+    return listings, written
+
+
+def export_static(output, workers=1, full=False, base_url=''):
+    """
+    Exporte le site statique dans output ; retourne (articles régénérés,
+    articles supprimés, pages de liste écrites).
+
+    base_url préfixe les liens entre pages de liste (vide : liens depuis la
+    racine du site).
+    """
+    started_at = timezone.now()
+    base_url = base_url.rstrip('/')
+    manifest = {'exported_at': None, 'articles': {}, 'listings': {}} if full else load_manifest(output)
+    since = manifest['exported_at'] and datetime.fromisoformat(manifest['exported_at'])
+
+    published_ids = set(Article.objects.published().values_list('pk', flat=True))
+    previous = manifest['articles']
+    # Articles modifiés, plus ceux devenus visibles sans modification (publication programmée)
+    changed = sorted(
+        set(changed_article_ids(since)) | {pk for pk in published_ids if str(pk) not in previous}
+    )
+
+    chunks = [changed[i:i + CHUNK_SIZE] for i in range(0, len(changed), CHUNK_SIZE)]
+    exported = {}
+    if workers > 1 and len(chunks) > 1:
+        # Les connexions ouvertes ne doivent pas être partagées avec les processus fils
+        connections.close_all()
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('fork'),
+            initializer=_init_worker,
+        ) as pool:
+            for result in pool.map(export_articles, chunks, [output] * len(chunks)):
+                exported.update(result)
+    else:
+        for chunk in chunks:
+            exported.update(export_articles(chunk, output))
+
+    articles = {pk: slug for pk, slug in previous.items() if int(pk) in published_ids}
+    removed = 0
+    for pk, slug in previous.items():
+        # Article dépublié, supprimé ou dont le slug a changé
+        if int(pk) not in published_ids or exported.get(pk, slug) != slug:
+            removed += 1
+            if os.path.exists(_detail_path(output, slug)):
+                os.remove(_detail_path(output, slug))
+            shutil.rmtree(_html_dir(output, slug), ignore_errors=True)
+    articles.update(exported)
+
+    # Liste unique des versions précédentes, remplacée par les pages
+    legacy_index = os.path.join(output, 'api', 'articles', 'index.json')
+    if os.path.exists(legacy_index):
+        os.remove(legacy_index)
+    # Après --full, tous les articles sont régénérés donc toutes les pages réécrites ;
+    # l'état précédent sert alors seulement à supprimer les listes disparues
+    previous_listings = load_manifest(output).get('listings', {})
+    listings, pages = export_listings(output, previous_listings, set(map(int, exported)), base_url)
+    _write(
+        os.path.join(output, MANIFEST_NAME),
+        json.dumps({
+            'exported_at': started_at.isoformat(),
+            'articles': articles,
+            'listings': listings,
+        }),
+    )
+    return len(exported), removed, pages
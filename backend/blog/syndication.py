@@ -0,0 +1,59 @@
+"""
+Cache des flux RSS/Atom et des sitemaps.
+
+Chaque flux ou segment de sitemap a sa portée (ex. 'feed:category:python',
+'sitemap:articles:3') et un numéro de génération dans le cache. Les clés des
+contenus incluent ce numéro : publier ou modifier un article incrémente la
+génération des seules portées concernées, les autres restent en cache.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Category, Tag
+
+CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def _generation_key(scope):
+    return f'blog:syndication:generation:{scope}'
+
+
+def cache_key(scope, *parts):
+    """Clé du contenu d'une portée pour sa génération courante"""
+    generation = cache.get(_generation_key(scope))
+    if generation is None:
+        generation = 0
+        cache.add(_generation_key(scope), generation, None)
+    return ':'.join(['blog:syndication', scope, str(generation), *map(str, parts)])
+
+
+def invalidate(scopes):
+    for scope in scopes:
+        try:
+            cache.incr(_generation_key(scope))
+        except ValueError:
+            cache.set(_generation_key(scope), 1, None)
+
+
+def sitemap_segment(article_id):
+    """Segment de sitemap contenant l'article (tranches d'ids fixes)"""
+    return article_id // settings.SITEMAP_SEGMENT_SIZE
+
+
+def invalidate_published(article_ids=(), category_ids=(), tag_ids=()):
+    """Invalide les flux et segments de sitemap touchés par des articles publiés"""
+    category_ids = {pk for pk in category_ids if pk is not None}
+    tag_ids = set(tag_ids)
+    scopes = {'feed:all', 'sitemap:index'}
+    scopes.update(f'sitemap:articles:{sitemap_segment(pk)}' for pk in article_ids)
+    if category_ids:
+        scopes.update(
+            f'feed:category:{slug}'
+            for slug in Category.objects.filter(pk__in=category_ids).values_list('slug', flat=True)
+        )
+    if tag_ids:
+        scopes.update(
+            f'feed:tag:{slug}'
+            for slug in Tag.objects.filter(pk__in=tag_ids).values_list('slug', flat=True)
+        )
+    invalidate(scopes)
@@ -0,0 +1,66 @@
+from django.core.cache import cache
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .models import Article, Category, Tag
+
+TAG_CLOUD_CACHE_KEY = 'blog:tag_cloud'
+TAG_CLOUD_CACHE_TIMEOUT = 60 * 60
+
+
+def _count_subquery(queryset, group_field):
+    """Sous-requête corrélée comptant les lignes par groupe (0 si aucune)"""
+    counts = queryset.order_by().values(group_field).annotate(c=Count('pk')).values('c')
+    return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+
+def published_articles():
+    """Articles comptabilisés dans les compteurs de catégories et de tags"""
+    return Article.objects.published()
+
+
+def refresh_category_counts(category_ids=None):
+    """Recalcule le nombre d'articles publiés des catégories données (toutes si None)"""
+    queryset = Category.objects.all()
+    if category_ids is not None:
+        category_ids = {pk for pk in category_ids if pk is not None}
+        if not category_ids:
+            return
+        queryset = queryset.filter(pk__in=category_ids)
+
+    queryset.update(article_count=_count_subquery(
+        published_articles().filter(category=OuterRef('pk')), 'category'
+    ))
+
+
+def refresh_tag_counts(tag_ids=None):
+    """Recalcule le nombre d'articles publiés des tags donnés (tous si None)"""
+    queryset = Tag.objects.all()
+    if tag_ids is not None:
+        tag_ids = set(tag_ids)
+        if not tag_ids:
+            return
+        queryset = queryset.filter(pk__in=tag_ids)
+
+    through = Article.tags.through
+    queryset.update(article_count=_count_subquery(
+        through.objects.filter(
+            tag=OuterRef('pk'),
+            article__in=published_articles(),
+        ),
+        'tag',
+    ))
+    cache.delete(TAG_CLOUD_CACHE_KEY)
+
+
+def get_tag_cloud():
+    """Retourne les tags utilisés, triés par popularité, depuis le cache si possible"""
+    cloud = cache.get(TAG_CLOUD_CACHE_KEY)
+    if cloud is None:
+        cloud = list(
+            Tag.objects.filter(article_count__gt=0)
+            .order_by('-article_count', 'name')
+            .values('id', 'name', 'slug', 'article_count')
+        )
+        cache.set(TAG_CLOUD_CACHE_KEY, cloud, TAG_CLOUD_CACHE_TIMEOUT)
+    return cloud
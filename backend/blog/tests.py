@@ -0,0 +1,70 @@
+from django.contrib.auth.models import User
+from django.test import RequestFactory, TestCase
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from .fast_serializers import serialize_article_list
+from .models import Article, Category, Tag
+from .serializers import ArticleListSerializer
+
+
+class FastArticleListContractTests(TestCase):
+    """Le chemin rapide doit produire exactement le JSON de ArticleListSerializer"""
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user(
+            'auteur', 'auteur@example.com', 'motdepasse', first_name='Ada', last_name='L.'
+        )
+        category = Category.objects.create(name='Python', description='Tout sur Python')
+        tags = [Tag.objects.create(name=name) for name in ['zeta', 'alpha', 'mu']]
+        now = timezone.now()
+
+        cls.articles = []
+        for tag_count in range(4):
+            article = Article.objects.create(
+                title=f'Article avec {tag_count} tag(s)',
+                content='mot ' * (150 * tag_count + 10),
+                author=author,
+                status='published',
+                published_at=now,
+                # Catégorie, score et image absents sur un article sur deux
+                category=category if tag_count % 2 else None,
+                ai_checked=bool(tag_count % 2),
+                ai_score=7.5 if tag_count % 2 else None,
+                featured_image='articles/photo.jpg' if tag_count % 2 else None,
+            )
+            article.tags.set(tags[:tag_count])
+            cls.articles.append(article)
+
+        cls.articles.append(Article.objects.create(
+            title='Brouillon', content='Pas encore publié', author=author, category=category,
+        ))
+        cls.articles[-1].tags.set(tags)
+
+    def render_both(self, request=None):
+        ids = [article.pk for article in reversed(self.articles)]
+        queryset = Article.objects.filter(pk__in=ids).select_related(
+            'author', 'category'
+        ).prefetch_related('tags')
+        by_id = {article.pk: article for article in queryset}
+        expected = ArticleListSerializer(
+            [by_id[pk] for pk in ids], many=True, context={'request': request}
+        ).data
+        renderer = JSONRenderer()
+        return renderer.render(expected), renderer.render(serialize_article_list(ids, request))
+
+    def test_same_output_without_request(self):
+        expected, fast = self.render_both()
+        self.assertEqual(fast, expected)
+
+    def test_same_output_with_request(self):
+        expected, fast = self.render_both(RequestFactory().get('/api/articles/'))
+        self.assertIn(b'http://testserver/', fast)
+        self.assertEqual(fast, expected)
+
+    def test_draft_is_serialized(self):
+        data = serialize_article_list([self.articles[-1].pk])
+        self.assertEqual(data[0]['status'], 'draft')
+        self.assertIsNone(data[0]['published_at'])
+        self.assertEqual([tag['name'] for tag in data[0]['tags']], ['alpha', 'mu', 'zeta'])
@@ -0,0 +1,165 @@
+"""
+Limitation de débit par seau à jetons (token bucket).
+
+Chaque seau contient au plus N jetons et se remplit de N jetons par période,
+selon les taux de REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'] (ex. '10/min').
+Les seaux sont stockés dans le cache Django (Redis en production, voir
+CACHE_URL) pour être partagés entre processus. Avec Redis, le retrait d'un
+jeton est un script Lua exécuté de façon atomique par le serveur : des
+requêtes simultanées ne peuvent pas consommer le même jeton. Les autres
+caches sont mis à jour sous un verrou du processus ; si le cache est
+indisponible, un stockage local au processus prend le relais.
+"""
+import logging
+import threading
+import time
+
+from django.core.cache import cache, caches
+from django.core.cache.backends.redis import RedisCache
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+DURATIONS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+# KEYS[1] : seau ; ARGV : capacité, jetons par seconde, durée de vie en secondes.
+# L'heure du serveur Redis sert de référence commune à tous les processus.
+TAKE_TOKEN_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local refill_rate = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(bucket[1]) or capacity
+local updated_at = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated_at) * refill_rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated_at', tostring(now))
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+return {allowed, tostring(tokens)}
+"""
+
+
+def refill(bucket, capacity, refill_rate, now):
+    """Retire un jeton d'un seau (jetons, date) ; retourne (accordé, nouveau seau)"""
+    tokens, updated_at = bucket or (capacity, now)
+    tokens = min(capacity, tokens + max(0, now - updated_at) * refill_rate)
+    allowed = tokens >= 1
+    if allowed:
+        tokens -= 1
+    return allowed, (tokens, now)
+
+
+class BucketStore:
+    """Stockage des seaux : cache Django, avec repli en mémoire locale"""
+
+    def __init__(self):
+        self._local = {}
+        self._lock = threading.Lock()
+        self._script = None
+
+    def _take_redis(self, key, capacity, refill_rate, timeout):
+        if self._script is None:
+            client = caches['default']._cache.get_client(write=True)
+            self._script = client.register_script(TAKE_TOKEN_SCRIPT)
+        allowed, tokens = self._script(
+            keys=[cache.make_key(key)], args=[capacity, refill_rate, timeout]
+        )
+        return bool(allowed), float(tokens)
+
+    def take(self, key, capacity, refill_rate, timeout):
+        """
+        Retire un jeton du seau s'il en reste ; retourne (accordé, jetons restants).
+        Le seau expire au bout de timeout secondes sans requête.
+        """
+        try:
+            if isinstance(caches['default'], RedisCache):
+                return self._take_redis(key, capacity, refill_rate, timeout)
+            with self._lock:
+                allowed, bucket = refill(cache.get(key), capacity, refill_rate, time.time())
+                cache.set(key, bucket, timeout)
+        except Exception:
+            logger.warning('Cache indisponible, limitation de débit en mémoire locale')
+            with self._lock:
+                allowed, bucket = refill(self._local.get(key), capacity, refill_rate, time.time())
+                self._local[key] = bucket
+        return allowed, bucket[0]
+
+
+bucket_store = BucketStore()
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Limite par seau à jetons pour une portée (scope) donnée.
+
+    key_by vaut 'user' (utilisateur connecté, sinon adresse IP) ou 'ip'.
+    """
+    scope = None
+    key_by = 'user'
+    store = bucket_store
+
+    def __init__(self):
+        self.wait_seconds = None
+
+    def get_rate(self):
+        """Retourne (capacité, jetons par seconde) ou None si la portée n'est pas limitée"""
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+        if rate is None:
+            return None
+        num, period = rate.split('/')
+        num = int(num)
+        return num, num / DURATIONS[period[0]]
+
+    def get_cache_key(self, request, view):
+        if self.key_by == 'user' and request.user and request.user.is_authenticated:
+            ident = f'user:{request.user.pk}'
+        else:
+            ident = f'ip:{self.get_ident(request)}'
+        return f'throttle:{self.scope}:{ident}'
+
+    def allow_request(self, request, view):
+        rate = self.get_rate()
+        if rate is None:
+            return True
+        capacity, refill_rate = rate
+
+        key = self.get_cache_key(request, view)
+        # Le seau est plein au bout de capacity / refill_rate secondes : inutile de le garder au-delà
+        allowed, tokens = self.store.take(
+            key, capacity, refill_rate, timeout=int(capacity / refill_rate) + 1
+        )
+        if not allowed:
+            self.wait_seconds = (1 - tokens) / refill_rate
+
+        metrics.increment(f'throttle.{self.scope}.{"allowed" if allowed else "rejected"}')
+        return allowed
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class RegisterRateThrottle(TokenBucketThrottle):
+    scope = 'register'
+    key_by = 'ip'
+
+
+class CommentRateThrottle(TokenBucketThrottle):
+    scope = 'comments'
+
+
+class AIRateThrottle(TokenBucketThrottle):
+    scope = 'ai'
+
+
+class AIIPRateThrottle(TokenBucketThrottle):
+    """Limite globale par IP, contre la multiplication des comptes"""
+    scope = 'ai_ip'
+    key_by = 'ip'
@@ -1,9 +1,9 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from . import views
+from . import feeds, views
 
 router = DefaultRouter()
-router.register(r'articles', views.ArticleViewSet)
+router.register(r'articles', views.ArticleViewSet, basename='article')
 router.register(r'categories', views.CategoryViewSet)
 router.register(r'tags', views.TagViewSet)
 router.register(r'comments', views.CommentViewSet)
@@ -11,5 +11,12 @@ router.register(r'comments', views.CommentViewSet)
 app_name = 'blog'
 
 urlpatterns = [
+    path('metrics/', views.metrics_view, name='metrics'),
+    path('feeds/rss/', feeds.latest_rss, name='feed-rss'),
+    path('feeds/atom/', feeds.latest_atom, name='feed-atom'),
+    path('feeds/categories/<slug:slug>/rss/', feeds.category_rss, name='category-feed-rss'),
+    path('feeds/categories/<slug:slug>/atom/', feeds.category_atom, name='category-feed-atom'),
+    path('feeds/tags/<slug:slug>/rss/', feeds.tag_rss, name='tag-feed-rss'),
+    path('feeds/tags/<slug:slug>/atom/', feeds.tag_atom, name='tag-feed-atom'),
     path('', include(router.urls)),
 ]
@@ -0,0 +1,167 @@
+"""
+Comptage des vues d'articles sans écriture par requête.
+
+Chaque processus accumule les vues en mémoire et les écrit par lots : une
+seule requête UPDATE pour Article.view_count, et une pour les totaux du jour
+dans ArticleViewStat. Le tampon est vidé toutes les VIEW_COUNT_FLUSH_INTERVAL
+secondes par un thread du processus (même sans nouvelle vue), dès qu'il
+contient VIEW_COUNT_BUFFER_SIZE vues, et à l'arrêt normal du processus.
+
+Le tampon ne dépasse pas VIEW_COUNT_BUFFER_SIZE vues : si la base ne répond
+pas, les vues au-delà sont perdues (journalisées et comptées dans la métrique
+view_counter.dropped), et l'écriture n'est retentée qu'après l'intervalle.
+Perte en cas d'arrêt brutal : au plus VIEW_COUNT_BUFFER_SIZE vues par
+processus, en pratique les vues des VIEW_COUNT_FLUSH_INTERVAL dernières
+secondes.
+"""
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Case, F, PositiveIntegerField, Value, When
+from django.utils import timezone
+
+from . import metrics
+from .models import Article, ArticleViewStat
+
+logger = logging.getLogger(__name__)
+
+
+def _increments(deltas, field):
+    """Expression CASE ajoutant à chaque ligne le delta de son article"""
+    return Case(
+        *(When(**{field: article_id}, then=Value(count)) for article_id, count in deltas.items()),
+        default=Value(0),
+        output_field=PositiveIntegerField(),
+    )
+
+
+def write_views(deltas, day=None):
+    """Ajoute les vues {article_id: nombre} aux compteurs totaux et journaliers"""
+    day = day or timezone.localdate()
+    with transaction.atomic():
+        # Les articles supprimés depuis la vue sont ignorés
+        deltas = {
+            pk: deltas[pk]
+            for pk in Article.objects.filter(pk__in=deltas).values_list('pk', flat=True)
+        }
+        if not deltas:
+            return
+        Article.objects.filter(pk__in=deltas).update(
+            view_count=F('view_count') + _increments(deltas, 'pk')
+        )
+        ArticleViewStat.objects.bulk_create(
+            [ArticleViewStat(article_id=pk, date=day) for pk in deltas],
+            ignore_conflicts=True,
+        )
+        ArticleViewStat.objects.filter(date=day, article_id__in=deltas).update(
+            views=F('views') + _increments(deltas, 'article_id')
+        )
+
+
+class ViewCounter:
+    """Tampon des vues du processus, vidé périodiquement en base"""
+
+    def __init__(self, flush_interval=None, buffer_size=None):
+        self.flush_interval = (
+            settings.VIEW_COUNT_FLUSH_INTERVAL if flush_interval is None else flush_interval
+        )
+        self.buffer_size = settings.VIEW_COUNT_BUFFER_SIZE if buffer_size is None else buffer_size
+        self._pending = Counter()
+        self._size = 0
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        # Processus du thread de vidage : un processus forké doit lancer le sien
+        self._timer_pid = None
+
+    def record(self, article_id):
+        """Compte une vue ; écrit le tampon si l'intervalle ou la taille sont atteints"""
+        with self._lock:
+            self._start_timer()
+            due = time.monotonic() - self._last_flush >= self.flush_interval
+            if self._size >= self.buffer_size and not due:
+                # Tampon plein après un échec d'écriture : on attend l'intervalle
+                dropped = True
+            else:
+                dropped = False
+                self._pending[article_id] += 1
+                self._size += 1
+                due = due or self._size >= self.buffer_size
+        if dropped:
+            metrics.increment('view_counter.dropped')
+        elif due:
+            self.flush()
+
+    def pending(self):
+        with self._lock:
+            return dict(self._pending)
+
+    def _start_timer(self):
+        """Lance le thread qui vide le tampon d'un processus sans nouvelles vues"""
+        if self._timer_pid == os.getpid() or self.flush_interval <= 0:
+            return
+        self._timer_pid = os.getpid()
+        threading.Thread(target=self._flush_periodically, name='view-counter', daemon=True).start()
+
+    def _flush_periodically(self):
+        while True:
+            time.sleep(self.flush_interval)
+            if time.monotonic() - self._last_flush < self.flush_interval:
+                continue
+            try:
+                self.flush()
+            finally:
+                # Connexion propre à ce thread : ne pas la garder ouverte entre deux vidages
+                connections.close_all()
+
+    def flush(self):
+        """
+        Écrit les vues en attente ; en cas d'erreur, elles retournent dans le
+        tampon, dans la limite de sa taille.
+        """
+        # Un seul vidage à la fois : les autres threads continuent de compter
+        if not self._flush_lock.acquire(blocking=False):
+            return 0
+        try:
+            with self._lock:
+                deltas, self._pending = self._pending, Counter()
+                self._size = 0
+                self._last_flush = time.monotonic()
+            if not deltas:
+                return 0
+            try:
+                write_views(deltas)
+            except Exception:
+                logger.exception('Écriture des compteurs de vues impossible')
+                self._restore(deltas)
+                return 0
+            total = sum(deltas.values())
+            metrics.increment('view_counter.flushes')
+            metrics.increment('view_counter.views', total)
+            return total
+        finally:
+            self._flush_lock.release()
+
+    def _restore(self, deltas):
+        """Remet les vues non écrites dans le tampon, sans dépasser buffer_size"""
+        dropped = 0
+        with self._lock:
+            for article_id, count in deltas.items():
+                kept = min(count, max(self.buffer_size - self._size, 0))
+                if kept:
+                    self._pending[article_id] += kept
+                    self._size += kept
+                dropped += count - kept
+        if dropped:
+            logger.warning('%d vue(s) perdue(s) : tampon des compteurs plein', dropped)
+            metrics.increment('view_counter.dropped', dropped)
+
+
+view_counter = ViewCounter()
+atexit.register(view_counter.flush)
@@ -1,37 +1,79 @@
 from rest_framework import viewsets, status, filters
-from rest_framework.decorators import action
+from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated
+from rest_framework.permissions import (
+    IsAuthenticatedOrReadOnly, IsAuthenticated, IsAdminUser, SAFE_METHODS
+)
 from django_filters.rest_framework import DjangoFilterBackend
 from django.shortcuts import get_object_or_404
 from django.db.models import Q
-from .models import Article, Category, Tag, Comment
+from django.utils import timezone
+from .models import Article, ArticleRevision, Category, Tag, Comment
 from .serializers import (
     ArticleListSerializer, ArticleDetailSerializer, ArticleCreateUpdateSerializer,
     CategorySerializer, TagSerializer, CommentSerializer, ArticleSearchSerializer
 )
+from .ai_checks import check_article
+from .fast_serializers import serialize_article_list
 from .permissions import IsAuthorOrReadOnly
+from .taxonomy import get_tag_cloud
+from .throttling import AIIPRateThrottle, AIRateThrottle, CommentRateThrottle
+from .rankings import ranked_article_ids
+from .revisions import get_revision
+from .view_counter import view_counter
+from . import metrics
+
+
+class SparseFieldsetMixin:
+    """Transmet le paramètre ?fields=a,b au sérialiseur pour les lectures"""
+    
+    def get_sparse_fields(self):
+        if self.request is None or self.request.method not in SAFE_METHODS:
+            return None
+        value = self.request.query_params.get('fields')
+        if not value:
+            return None
+        return [name.strip() for name in value.split(',') if name.strip()]
+    
+    def get_serializer(self, *args, **kwargs):
+        fields = self.get_sparse_fields()
+        if fields:
+            kwargs.setdefault('fields', fields)
+        return super().get_serializer(*args, **kwargs)
 
 
-class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
+class CategoryViewSet(SparseFieldsetMixin, viewsets.ReadOnlyModelViewSet):
     """Vue pour les catégories (lecture seule)"""
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     lookup_field = 'slug'
-    filter_backends = [filters.SearchFilter]
+    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['name', 'description']
+    ordering_fields = ['name', 'article_count']
+    ordering = ['name']
 
 
-class TagViewSet(viewsets.ReadOnlyModelViewSet):
+class TagViewSet(SparseFieldsetMixin, viewsets.ReadOnlyModelViewSet):
     """Vue pour les tags (lecture seule)"""
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
     lookup_field = 'slug'
-    filter_backends = [filters.SearchFilter]
+    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['name']
+    ordering_fields = ['name', 'article_count']
+    ordering = ['name']
+    
+    @action(detail=False, methods=['get'])
+    def cloud(self, request):
+        """Nuage de tags servi depuis les compteurs précalculés"""
+        cloud = get_tag_cloud()
+        limit = request.query_params.get('limit')
+        if limit and limit.isdigit():
+            cloud = cloud[:int(limit)]
+        return Response(cloud)
 
 
-class ArticleViewSet(viewsets.ModelViewSet):
+class ArticleViewSet(SparseFieldsetMixin, viewsets.ModelViewSet):
     """Vue pour les articles avec toutes les opérations CRUD"""
     permission_classes = [IsAuthenticatedOrReadOnly, IsAuthorOrReadOnly]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
@@ -42,11 +84,12 @@ class ArticleViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         """Retourne les articles publiés pour les visiteurs, tous pour les auteurs"""
-        if self.action == 'list' and not self.request.user.is_authenticated:
-            return Article.objects.filter(status='published')
-        elif self.action == 'list' and not self.request.user.is_staff:
+        if self.action in ['list', 'retrieve'] and not self.request.user.is_authenticated:
+            return Article.objects.published()
+        elif self.action in ['list', 'retrieve'] and not self.request.user.is_staff:
             return Article.objects.filter(
-                Q(status='published') | Q(author=self.request.user)
+                Q(status='published', published_at__lte=timezone.now())
+                | Q(author=self.request.user)
             )
         return Article.objects.all()
     
@@ -62,6 +105,40 @@ class ArticleViewSet(viewsets.ModelViewSet):
         """Assigne automatiquement l'auteur lors de la création"""
         serializer.save(author=self.request.user)
     
+    def list(self, request, *args, **kwargs):
+        """Liste paginée servie par le chemin rapide (voir blog.fast_serializers)"""
+        queryset = self.filter_queryset(self.get_queryset()).values_list('pk', flat=True)
+        fields = self.get_sparse_fields()
+        
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(serialize_article_list(page, request, fields))
+        return Response(serialize_article_list(queryset, request, fields))
+    
+    def retrieve(self, request, *args, **kwargs):
+        """Détail d'un article ; les vues des articles publiés sont comptées"""
+        instance = self.get_object()
+        if instance.is_published:
+            view_counter.record(instance.pk)
+        serializer = self.get_serializer(instance)
+        return Response(serializer.data)
+    
+    def get_feed_limit(self, default=10, maximum=50):
+        limit = self.request.query_params.get('limit', '')
+        return min(int(limit), maximum) if limit.isdigit() else default
+    
+    @action(detail=False, methods=['get'])
+    def popular(self, request):
+        """Articles les plus populaires du mois (classement précalculé)"""
+        ids = ranked_article_ids('popular', self.get_feed_limit())
+        return Response(serialize_article_list(ids, request, self.get_sparse_fields()))
+    
+    @action(detail=False, methods=['get'])
+    def trending(self, request):
+        """Articles tendance de la semaine (classement précalculé)"""
+        ids = ranked_article_ids('trending', self.get_feed_limit())
+        return Response(serialize_article_list(ids, request, self.get_sparse_fields()))
+    
     @action(detail=False, methods=['get'])
     def my_articles(self, request):
         """Retourne les articles de l'utilisateur connecté"""
@@ -72,8 +149,7 @@ class ArticleViewSet(viewsets.ModelViewSet):
             )
         
         articles = Article.objects.filter(author=request.user)
-        serializer = ArticleListSerializer(articles, many=True)
-        return Response(serializer.data)
+        return Response(serialize_article_list(articles.values_list('pk', flat=True)))
     
     @action(detail=False, methods=['get'])
     def drafts(self, request):
@@ -85,8 +161,7 @@ class ArticleViewSet(viewsets.ModelViewSet):
             )
         
         drafts = Article.objects.filter(author=request.user, status='draft')
-        serializer = ArticleListSerializer(drafts, many=True)
-        return Response(serializer.data)
+        return Response(serialize_article_list(drafts.values_list('pk', flat=True)))
     
     @action(detail=False, methods=['post'])
     def search(self, request):
@@ -114,25 +189,37 @@ class ArticleViewSet(viewsets.ModelViewSet):
             
             # Filtrer par statut publié pour les visiteurs
             if not request.user.is_authenticated:
-                queryset = queryset.filter(status='published')
+                queryset = queryset.published()
             
-            serializer_result = ArticleListSerializer(queryset, many=True)
-            return Response(serializer_result.data)
+            return Response(serialize_article_list(queryset.values_list('pk', flat=True)))
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
+    @action(detail=True, methods=['get'])
+    def related(self, request, pk=None):
+        """Retourne les articles similaires depuis l'index précalculé"""
+        article = self.get_object()
+        related = Article.objects.published().filter(
+            related_to__article_id=article.pk
+        ).order_by('-related_to__score')
+        
+        return Response(serialize_article_list(related.values_list('pk', flat=True), request))
+    
     @action(detail=True, methods=['post'])
     def publish(self, request, pk=None):
         """Publie un article (change le statut de draft à published)"""
         article = self.get_object()
         
-        if article.author != request.user and not request.user.is_staff:
+        if article.author_id != request.user.id and not request.user.is_staff:
             return Response(
                 {'error': 'Permission refusée'}, 
                 status=status.HTTP_403_FORBIDDEN
             )
         
         article.status = 'published'
+        # Publier un article programmé avance sa date de publication à maintenant
+        if article.published_at and article.published_at > timezone.now():
+            article.published_at = timezone.now()
         article.save()
         
         serializer = ArticleDetailSerializer(article)
@@ -141,26 +228,49 @@ class ArticleViewSet(viewsets.ModelViewSet):
             'article': serializer.data
         })
     
-    @action(detail=True, methods=['post'])
+    @action(detail=True, methods=['get'])
+    def revisions(self, request, pk=None):
+        """Historique des révisions de l'article (auteur ou staff)"""
+        article = self.get_object()
+        
+        if article.author_id != request.user.id and not request.user.is_staff:
+            return Response(
+                {'error': 'Permission refusée'}, 
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        revisions = ArticleRevision.objects.filter(article=article).order_by('-number')
+        return Response(list(revisions.values('number', 'title', 'created_at')))
+    
+    @action(detail=True, methods=['get'], url_path=r'revisions/(?P<number>\d+)')
+    def revision(self, request, pk=None, number=None):
+        """Texte complet d'une révision, reconstruit depuis l'historique"""
+        article = self.get_object()
+        
+        if article.author_id != request.user.id and not request.user.is_staff:
+            return Response(
+                {'error': 'Permission refusée'}, 
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        revision = get_revision(article.pk, int(number))
+        if revision is None:
+            return Response({'error': 'Révision introuvable'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(revision)
+    
+    @action(detail=True, methods=['post'], throttle_classes=[AIRateThrottle, AIIPRateThrottle])
     def check_with_ai(self, request, pk=None):
         """Vérifie le contenu de l'article avec l'IA"""
         article = self.get_object()
         
-        if article.author != request.user and not request.user.is_staff:
+        if article.author_id != request.user.id and not request.user.is_staff:
             return Response(
                 {'error': 'Permission refusée'}, 
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        # Importer le service IA
-        from ai_content_checker.services import AIContentChecker
-        
-        ai_checker = AIContentChecker()
-        result = ai_checker.check_article_content(
-            article.title, 
-            article.content, 
-            article.excerpt
-        )
+        # Seules les sections modifiées depuis la dernière vérification sont soumises à l'IA
+        result = check_article(article)
         
         if result['success']:
             # Mettre à jour l'article avec les résultats de l'IA
@@ -182,12 +292,18 @@ class ArticleViewSet(viewsets.ModelViewSet):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(SparseFieldsetMixin, viewsets.ModelViewSet):
     """Vue pour les commentaires"""
     queryset = Comment.objects.filter(is_approved=True)
     serializer_class = CommentSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
     
+    def get_throttles(self):
+        """Limite uniquement la création de commentaires"""
+        if self.action == 'create':
+            return [CommentRateThrottle()]
+        return super().get_throttles()
+    
     def get_queryset(self):
         """Filtre les commentaires par article si spécifié"""
         article_id = self.request.query_params.get('article')
@@ -201,3 +317,10 @@ class CommentViewSet(viewsets.ModelViewSet):
         if article_id:
             article = get_object_or_404(Article, id=article_id)
             serializer.save(article=article)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def metrics_view(request):
+    """Compteurs internes du processus (limitation de débit, etc.)"""
+    return Response(metrics.snapshot())
@@ -1,6 +1,6 @@
 import os
 from pathlib import Path
-from decouple import config
+from decouple import Csv, config
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -34,6 +34,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
+    'blog.middleware.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -43,6 +44,10 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Compression des réponses (voir blog.middleware)
+API_COMPRESSION_MIN_SIZE = config('API_COMPRESSION_MIN_SIZE', default=1024, cast=int)
+API_COMPRESSION_BROTLI_QUALITY = config('API_COMPRESSION_BROTLI_QUALITY', default=5, cast=int)
+
 ROOT_URLCONF = 'config.urls'
 
 TEMPLATES = [
@@ -64,20 +69,63 @@ TEMPLATES = [
 WSGI_APPLICATION = 'config.wsgi.application'
 
 # Database
+DATABASE_ENGINE = config('DATABASE_ENGINE', default='django.db.backends.mysql')
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.mysql',
+        'ENGINE': DATABASE_ENGINE,
         'NAME': config('DATABASE_NAME'),
-        'USER': config('DATABASE_USER'),
-        'PASSWORD': config('DATABASE_PASSWORD'),
-        'HOST': config('DATABASE_HOST'),
-        'PORT': config('DATABASE_PORT'),
+        'USER': config('DATABASE_USER', default=''),
+        'PASSWORD': config('DATABASE_PASSWORD', default=''),
+        'HOST': config('DATABASE_HOST', default=''),
+        'PORT': config('DATABASE_PORT', default=''),
+        # Connexions persistantes, vérifiées avant réutilisation
+        'CONN_MAX_AGE': config('DATABASE_CONN_MAX_AGE', default=60, cast=int),
+        'CONN_HEALTH_CHECKS': True,
         'OPTIONS': {
             'charset': 'utf8mb4',
-        },
+        } if DATABASE_ENGINE == 'django.db.backends.mysql' else {},
     }
 }
 
+# Réplicas en lecture : hôtes MySQL (ou fichiers pour SQLite) séparés par des virgules
+DATABASE_REPLICAS = config('DATABASE_REPLICAS', default='', cast=Csv())
+DATABASE_REPLICA_ALIASES = []
+for index, replica in enumerate(DATABASE_REPLICAS):
+    alias = f'replica_{index}'
+    location = {'NAME': replica} if 'sqlite' in DATABASE_ENGINE else {'HOST': replica}
+    DATABASES[alias] = {**DATABASES['default'], **location, 'TEST': {'MIRROR': 'default'}}
+    DATABASE_REPLICA_ALIASES.append(alias)
+
+# Durée pendant laquelle un client lit sur le primaire après une écriture
+DATABASE_REPLICA_STICKY_SECONDS = config('DATABASE_REPLICA_STICKY_SECONDS', default=5, cast=int)
+DATABASE_REPLICA_PATH_PREFIX = '/api/'
+
+if DATABASE_REPLICA_ALIASES:
+    DATABASE_ROUTERS = ['blog.db_routers.ReplicaRouter']
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index('django.middleware.security.SecurityMiddleware'),
+        'blog.middleware.ReplicaRoutingMiddleware',
+    )
+
+# Cache partagé entre processus et conteneurs (limitation de débit, flux,
+# sitemaps). Sans CACHE_URL, cache en mémoire du processus : réservé au
+# développement avec un seul processus.
+CACHE_URL = config('CACHE_URL', default='')
+if CACHE_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_URL,
+            'KEY_PREFIX': 'miniblog',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -94,6 +142,25 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing
+# Le premier hasher sert aux nouveaux mots de passe ; les hashs produits par les
+# autres sont vérifiés puis convertis automatiquement à la connexion suivante.
+PASSWORD_HASHER_CHOICES = {
+    'argon2': 'blog.hashers.TunedArgon2PasswordHasher',
+    'scrypt': 'blog.hashers.TunedScryptPasswordHasher',
+    'pbkdf2': 'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+}
+PASSWORD_HASHER = config('PASSWORD_HASHER', default='argon2')
+PASSWORD_HASHERS = [PASSWORD_HASHER_CHOICES[PASSWORD_HASHER]] + [
+    path for name, path in PASSWORD_HASHER_CHOICES.items() if name != PASSWORD_HASHER
+] + ['django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher']
+
+# Coûts par défaut : recommandations OWASP (Argon2id m=19 Mio, t=2, p=1)
+ARGON2_TIME_COST = config('ARGON2_TIME_COST', default=2, cast=int)
+ARGON2_MEMORY_COST = config('ARGON2_MEMORY_COST', default=19456, cast=int)
+ARGON2_PARALLELISM = config('ARGON2_PARALLELISM', default=1, cast=int)
+SCRYPT_WORK_FACTOR = config('SCRYPT_WORK_FACTOR', default=2 ** 14, cast=int)
+
 # Internationalization
 LANGUAGE_CODE = 'fr-fr'
 TIME_ZONE = 'Europe/Paris'
@@ -115,11 +182,21 @@ CORS_ALLOWED_ORIGINS = config('CORS_ALLOWED_ORIGINS', default='http://localhost:
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'blog.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ),
+    # orjson si disponible (voir blog.renderers), sinon le JSON standard de DRF
+    'DEFAULT_RENDERER_CLASSES': (
+        'blog.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'blog.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
     'DEFAULT_FILTER_BACKENDS': (
@@ -127,6 +204,13 @@ REST_FRAMEWORK = {
         'rest_framework.filters.SearchFilter',
         'rest_framework.filters.OrderingFilter',
     ),
+    # Taux des seaux à jetons de blog.throttling
+    'DEFAULT_THROTTLE_RATES': {
+        'register': config('THROTTLE_REGISTER_RATE', default='5/hour'),
+        'comments': config('THROTTLE_COMMENTS_RATE', default='10/min'),
+        'ai': config('THROTTLE_AI_RATE', default='20/hour'),
+        'ai_ip': config('THROTTLE_AI_IP_RATE', default='60/hour'),
+    },
 }
 
 # JWT settings
@@ -135,8 +219,46 @@ SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
     'ROTATE_REFRESH_TOKENS': True,
+    'TOKEN_OBTAIN_SERIALIZER': 'blog.authentication.TokenObtainPairWithClaimsSerializer',
 }
 
+# Cache des utilisateurs authentifiés par JWT (en secondes, par processus)
+AUTH_USER_CACHE_TTL = config('AUTH_USER_CACHE_TTL', default=30, cast=int)
+AUTH_USER_CACHE_MAX_SIZE = config('AUTH_USER_CACHE_MAX_SIZE', default=10000, cast=int)
+
+# Articles similaires (voir blog.related)
+RELATED_ARTICLES_COUNT = config('RELATED_ARTICLES_COUNT', default=10, cast=int)
+RELATED_ARTICLES_MAX_FEATURES = config('RELATED_ARTICLES_MAX_FEATURES', default=2048, cast=int)
+RELATED_ARTICLES_TAG_WEIGHT = config('RELATED_ARTICLES_TAG_WEIGHT', default=0.4, cast=float)
+RELATED_ARTICLES_MIN_SCORE = config('RELATED_ARTICLES_MIN_SCORE', default=0.05, cast=float)
+
+# Compteurs de vues (voir blog.view_counter)
+VIEW_COUNT_FLUSH_INTERVAL = config('VIEW_COUNT_FLUSH_INTERVAL', default=10, cast=int)
+VIEW_COUNT_BUFFER_SIZE = config('VIEW_COUNT_BUFFER_SIZE', default=1000, cast=int)
+
+# Classements populaires et tendance (voir blog.rankings)
+RANKING_SIZE = config('RANKING_SIZE', default=50, cast=int)
+RANKING_COMMENT_WEIGHT = config('RANKING_COMMENT_WEIGHT', default=10.0, cast=float)
+RANKING_RECENCY_WEIGHT = config('RANKING_RECENCY_WEIGHT', default=20.0, cast=float)
+
+# Flux RSS/Atom et sitemaps (voir blog.feeds et blog.sitemaps)
+SITE_URL = config('SITE_URL', default='http://localhost:3000').rstrip('/')
+FEED_SIZE = config('FEED_SIZE', default=20, cast=int)
+SITEMAP_SEGMENT_SIZE = config('SITEMAP_SEGMENT_SIZE', default=5000, cast=int)
+
+# Modération automatique des commentaires (voir blog.moderation)
+COMMENT_MODERATION_BATCH_SIZE = config('COMMENT_MODERATION_BATCH_SIZE', default=20, cast=int)
+COMMENT_MODERATION_APPROVE_THRESHOLD = config('COMMENT_MODERATION_APPROVE_THRESHOLD', default=0.9, cast=float)
+COMMENT_MODERATION_FLAG_THRESHOLD = config('COMMENT_MODERATION_FLAG_THRESHOLD', default=0.8, cast=float)
+# Délai (secondes) après lequel un lot pris par un worker arrêté est repris
+COMMENT_MODERATION_CLAIM_TIMEOUT = config('COMMENT_MODERATION_CLAIM_TIMEOUT', default=300, cast=int)
+
+# Historique des révisions : un instantané complet toutes les N révisions
+REVISION_SNAPSHOT_INTERVAL = config('REVISION_SNAPSHOT_INTERVAL', default=10, cast=int)
+
+# Admin : au-delà de ce nombre de lignes, les listes non filtrées affichent un total estimé
+ADMIN_ESTIMATED_COUNT_THRESHOLD = config('ADMIN_ESTIMATED_COUNT_THRESHOLD', default=10000, cast=int)
+
 # OpenAI settings
 OPENAI_API_KEY = config('OPENAI_API_KEY')
 OPENAI_MODEL = config('OPENAI_MODEL', default='gpt-3.5-turbo')
@@ -2,12 +2,16 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from blog import sitemaps
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('blog.urls')),
     path('api/auth/', include('blog.auth_urls')),
     path('api/ai/', include('ai_content_checker.urls')),
+    path('sitemap.xml', sitemaps.sitemap_index, name='sitemap'),
+    path('sitemap-pages.xml', sitemaps.pages_sitemap, name='sitemap-pages'),
+    path('sitemap-articles-<int:segment>.xml', sitemaps.articles_sitemap, name='sitemap-articles'),
 ]
 
 if settings.DEBUG: